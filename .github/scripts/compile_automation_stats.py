@@ -9,11 +9,46 @@ statistics about the ModForge autonomous development system.
 import os
 import json
 import re
+import heapq
+import asyncio
+import hashlib
 import logging
-from datetime import datetime, timedelta
+import multiprocessing
+from datetime import datetime, timedelta, timezone
 import subprocess
 from pathlib import Path
-import glob
+from functools import partial
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Stream workflow runs with ijson (which picks its C backend when available), falling back to loading whole files
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Read small workflow files concurrently with aiofiles, falling back to reads in worker threads
+try:
+    import aiofiles
+except ImportError:
+    aiofiles = None
+
+# Read git history through libgit2 when pygit2 is installed, falling back to parsing git log
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+# Parse and serialize JSON with orjson when it is installed, falling back to the standard library
+try:
+    import orjson
+    _loads = orjson.loads
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _loads = json.loads
+    def _dumps(obj):
+        return json.dumps(obj, indent=2).encode('utf-8')
 
 # Configure logging
 logging.basicConfig(
@@ -26,6 +61,129 @@ logger = logging.getLogger('ModForge-AutomationStats')
 DOCS_DIR = Path('docs')
 DATA_DIR = DOCS_DIR / 'src' / 'data'
 WORKFLOWS_DIR = DATA_DIR / 'workflows'
+STATS_FILE = DATA_DIR / 'automation_stats.json'
+
+# Number of recent entries kept in the statistics
+RECENT_LIMIT = 20
+
+# Workflow runs totalling less than this are read concurrently and parsed in-process, larger ones are
+# streamed and parsed in worker processes
+PROCESS_PARSE_MIN_BYTES = 8 << 20
+
+# Worker processes are started without forking, the pool is created while other threads may hold locks
+PROCESS_CONTEXT = multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+# Build output directories skipped when counting files, along with any hidden directory
+EXCLUDED_DIRS = frozenset({'build', 'out'})
+
+# Counter incremented for each tracked file extension
+FILE_TYPE_COUNTERS = {'.java': 'java_files', '.xml': 'xml_files'}
+
+# Read size and worker count used when counting lines in source files
+LINE_COUNT_CHUNK_SIZE = 1 << 20
+LINE_COUNT_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+
+# Read size used when streaming git output
+RECORD_READ_SIZE = 1 << 16
+
+# Commit classification of lower-cased messages, scanned in one pass; when several types match the earliest
+# in COMMIT_TYPES wins. Messages containing none of the keywords skip the regex entirely.
+COMMIT_TYPES = ('fix', 'improve', 'document', 'feature')
+COMMIT_TYPE_KEYWORDS = ('fix', 'improv', 'document', 'add', 'feature', 'implemented')
+COMMIT_TYPE_RE = re.compile(
+    r'\b(?:(?P<fix>fix(?:ed|ing)?)|(?P<improve>improv(?:e|ed|ing))|(?P<document>document(?:ation)?)|(?P<feature>add|feature|implemented))\b'
+)
+AUTO_MESSAGE_RE = re.compile(r'\[ModForge AI\]|Automated')
+
+def _list_workflow_files(suffix):
+    """List the workflow data files whose names end with the given suffix, using directory entries instead of stats"""
+    try:
+        with os.scandir(WORKFLOWS_DIR) as entries:
+            return [entry.path for entry in entries
+                    if entry.name.startswith('workflow_') and entry.name.endswith(suffix) and entry.is_file()]
+    except FileNotFoundError:
+        return []
+
+def _iter_runs(workflow_file):
+    """Yield the runs stored in a workflow runs file one at a time"""
+    with open(workflow_file, 'rb') as f:
+        if ijson is not None:
+            yield from ijson.items(f, 'workflow_runs.item')
+        else:
+            yield from _loads(f.read()).get('workflow_runs', [])
+
+def _push_recent(recent, entry):
+    """Push an entry onto a min-heap that keeps only the RECENT_LIMIT largest entries"""
+    if len(recent) < RECENT_LIMIT:
+        heapq.heappush(recent, entry)
+    else:
+        heapq.heappushpop(recent, entry)
+
+async def _read_files(paths):
+    """Read files concurrently, returning each file's bytes or the exception raised reading it"""
+    async def read(path):
+        if aiofiles is not None:
+            async with aiofiles.open(path, 'rb') as f:
+                return await f.read()
+        return await asyncio.to_thread(Path(path).read_bytes)
+        
+    return await asyncio.gather(*(read(path) for path in paths), return_exceptions=True)
+
+def _parse_workflow_file(workflow_file, workflow_names, content=None):
+    """Aggregate the runs of a single workflow runs file, using its already read content when given"""
+    file_stats = {
+        "total_runs": 0,
+        "successful_runs": 0,
+        "workflow_counts": {},
+        # Min-heap of (created_at, -run order, activity) holding only the newest runs seen so far
+        "recent_activity": []
+    }
+    
+    # [total, success, last_run] per workflow name
+    workflow_counts = defaultdict(lambda: [0, 0, None])
+    
+    try:
+        if isinstance(content, Exception):
+            raise content
+        runs = _iter_runs(workflow_file) if content is None else _loads(content).get('workflow_runs', [])
+        
+        for run in runs:
+            workflow_id = str(run.get('workflow_id', ''))
+            workflow_name = workflow_names.get(workflow_id, 'Unknown')
+            conclusion = run.get('conclusion', 'unknown')
+            is_success = conclusion == 'success'
+            created_at = run.get('created_at')
+            
+            # Count total and successful runs
+            file_stats['total_runs'] += 1
+            file_stats['successful_runs'] += is_success
+            
+            # Count by workflow type
+            counts = workflow_counts[workflow_name]
+            counts[0] += 1
+            counts[1] += is_success
+            
+            # Track recent activity
+            if created_at:
+                if counts[2] is None or created_at > counts[2]:
+                    counts[2] = created_at
+                    
+                _push_recent(file_stats['recent_activity'], (created_at, -file_stats['total_runs'], {
+                    'workflow': workflow_name,
+                    'status': conclusion,
+                    'created_at': created_at,
+                    'html_url': run.get('html_url', '')
+                }))
+                
+        if not file_stats['total_runs']:
+            logger.warning(f"No workflow_runs in {workflow_file}")
+    
+    except Exception as e:
+        logger.error(f"Error processing workflow file {workflow_file}: {e}")
+        
+    # A plain dict so the result can be sent back from a worker process
+    file_stats['workflow_counts'] = dict(workflow_counts)
+    return file_stats
 
 def load_workflow_data():
     """Load and analyze workflow run data"""
@@ -38,91 +196,98 @@ def load_workflow_data():
     
     # Load workflow list
     try:
-        with open(WORKFLOWS_DIR / 'workflow_list.json', 'r') as f:
-            workflows = json.load(f)
-            if isinstance(workflows, list):
-                # If it's a list of workflows in an array
-                workflow_map = {str(wf['id']): wf for wf in workflows}
-            else:
-                # If it's a single workflow object
-                workflow_map = {str(workflows['id']): workflows}
+        with open(WORKFLOWS_DIR / 'workflow_list.json', 'rb') as f:
+            workflows = _loads(f.read())
+            if not isinstance(workflows, list):
+                # If it's a single workflow object rather than a list of workflows in an array
+                workflows = [workflows]
+            workflow_names = {str(wf['id']): wf.get('name', 'Unknown') for wf in workflows}
     except Exception as e:
         logger.error(f"Error loading workflow list: {e}")
-        workflow_map = {}
+        workflow_names = {}
     
-    # Process each workflow's runs
-    for workflow_file in glob.glob(str(WORKFLOWS_DIR / 'workflow_*_runs.json')):
-        try:
-            with open(workflow_file, 'r') as f:
-                data = json.load(f)
-                
-                if 'workflow_runs' not in data:
-                    logger.warning(f"No workflow_runs in {workflow_file}")
-                    continue
-                    
-                runs = data['workflow_runs']
-                
-                for run in runs:
-                    workflow_id = str(run.get('workflow_id', ''))
-                    workflow_name = workflow_map.get(workflow_id, {}).get('name', 'Unknown')
-                    
-                    # Count total and successful runs
-                    workflow_stats['total_runs'] += 1
-                    if run.get('conclusion') == 'success':
-                        workflow_stats['successful_runs'] += 1
-                    
-                    # Count by workflow type
-                    if workflow_name not in workflow_stats['workflow_counts']:
-                        workflow_stats['workflow_counts'][workflow_name] = {
-                            'total': 0,
-                            'success': 0,
-                            'last_run': None
-                        }
-                    
-                    workflow_stats['workflow_counts'][workflow_name]['total'] += 1
-                    if run.get('conclusion') == 'success':
-                        workflow_stats['workflow_counts'][workflow_name]['success'] += 1
-                    
-                    # Track recent activity
-                    created_at = run.get('created_at')
-                    if created_at:
-                        if (not workflow_stats['workflow_counts'][workflow_name]['last_run'] or 
-                            created_at > workflow_stats['workflow_counts'][workflow_name]['last_run']):
-                            workflow_stats['workflow_counts'][workflow_name]['last_run'] = created_at
-                            
-                        workflow_stats['recent_activity'].append({
-                            'workflow': workflow_name,
-                            'status': run.get('conclusion', 'unknown'),
-                            'created_at': created_at,
-                            'html_url': run.get('html_url', '')
-                        })
+    # Min-heap of (created_at, -file order, -run order, activity) across all files
+    recent_activity = []
+    workflow_counts = defaultdict(lambda: [0, 0, None])
+    
+    # Parse each workflow's runs, in parallel processes only when there is enough data to outweigh their startup
+    workflow_files = _list_workflow_files('_runs.json')
+    if sum(os.path.getsize(path) for path in workflow_files) >= PROCESS_PARSE_MIN_BYTES:
+        with ProcessPoolExecutor(mp_context=PROCESS_CONTEXT) as executor:
+            parsed_files = list(executor.map(partial(_parse_workflow_file, workflow_names=workflow_names), workflow_files, chunksize=4))
+    else:
+        contents = asyncio.run(_read_files(workflow_files))
+        parsed_files = [_parse_workflow_file(path, workflow_names, content) for path, content in zip(workflow_files, contents)]
+        
+    # Merge the per-file results in file order
+    for file_index, file_stats in enumerate(parsed_files):
+        workflow_stats['total_runs'] += file_stats['total_runs']
+        workflow_stats['successful_runs'] += file_stats['successful_runs']
         
-        except Exception as e:
-            logger.error(f"Error processing workflow file {workflow_file}: {e}")
+        for workflow_name, (total, success, last_run) in file_stats['workflow_counts'].items():
+            merged = workflow_counts[workflow_name]
+            merged[0] += total
+            merged[1] += success
+            if last_run is not None and (merged[2] is None or last_run > merged[2]):
+                merged[2] = last_run
+                
+        for created_at, run_order, activity in file_stats['recent_activity']:
+            _push_recent(recent_activity, (created_at, -file_index, run_order, activity))
+    
+    workflow_stats['workflow_counts'] = {
+        workflow_name: {'total': total, 'success': success, 'last_run': last_run}
+        for workflow_name, (total, success, last_run) in workflow_counts.items()
+    }
     
-    # Sort recent activity by date (newest first)
-    workflow_stats['recent_activity'] = sorted(
-        workflow_stats['recent_activity'], 
-        key=lambda x: x['created_at'] if x['created_at'] else '', 
-        reverse=True
-    )[:20]  # Keep only the 20 most recent activities
+    # Sort recent activity by date (newest first, earlier runs first on ties)
+    workflow_stats['recent_activity'] = [activity for *_, activity in sorted(recent_activity, reverse=True)]
     
     return workflow_stats
 
+def _iter_records(stream, separator='\0'):
+    """Yield separator-terminated records from a text stream as they arrive"""
+    pending = ''
+    while chunk := stream.read(RECORD_READ_SIZE):
+        *records, pending = (pending + chunk).split(separator)
+        yield from records
+    if pending:
+        yield pending
+
+def _iter_commits(since):
+    """Yield (hash, author, email, date, subject) for each commit since the given time, newest first"""
+    if pygit2 is not None:
+        repo = pygit2.Repository(pygit2.discover_repository('.'))
+        cutoff = since.timestamp()
+        for commit in repo.walk(repo.head.target, pygit2.GIT_SORT_TOPOLOGICAL | pygit2.GIT_SORT_TIME):
+            # Children come before parents in commit time order, so like git log --since the walk stops at the first older commit
+            if commit.commit_time < cutoff:
+                break
+            author = commit.author
+            date = datetime.fromtimestamp(author.time, timezone(timedelta(minutes=author.offset)))
+            subject = ' '.join(line.strip() for line in commit.message.strip().split('\n\n', 1)[0].splitlines())
+            yield str(commit.id), author.name, author.email, date.strftime('%Y-%m-%d %H:%M:%S %z'), subject
+        return
+        
+    # Records are NUL-terminated with unit-separated fields, so subjects containing '|' or newlines parse cleanly
+    command = ['git', 'log', '-z', f'--since={since:%Y-%m-%d}', '--format=%H%x1f%an%x1f%ae%x1f%ad%x1f%s', '--date=iso']
+    
+    # Process commits as git produces them instead of buffering the whole log
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=-1) as proc:
+        for record in _iter_records(proc.stdout):
+            if record:
+                yield record.split('\x1f', 4)
+                
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, command)
+
 def analyze_git_history():
     """Analyze Git commit history for autonomous contributions"""
     try:
         # Get all commits in the last 30 days
-        thirty_days_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        thirty_days_ago = datetime.combine(datetime.now().date() - timedelta(days=30), datetime.min.time())
         
-        result = subprocess.run(
-            ['git', 'log', f'--since={thirty_days_ago}', '--format=%H|%an|%ae|%ad|%s', '--date=iso'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        commits = []
+        recent_commits = []
+        total_commit_count = 0
         auto_commit_count = 0
         manual_commit_count = 0
         commit_by_type = {
@@ -133,33 +298,19 @@ def analyze_git_history():
             'other': 0
         }
         
-        for line in result.stdout.strip().split('\n'):
-            if not line:
-                continue
-                
-            parts = line.split('|')
-            if len(parts) < 5:
-                continue
-                
-            commit_hash, author, email, date, message = parts
-            
+        for commit_hash, author, email, date, message in _iter_commits(thirty_days_ago):
             # Check if it's an automated commit
             is_auto = (
                 'ModForge Automation' in author or 
                 'automation@' in email or 
-                '[ModForge AI]' in message or
-                'Automated' in message
+                AUTO_MESSAGE_RE.search(message) is not None
             )
             
+            lowered = message.lower()
             commit_type = 'other'
-            if re.search(r'\bfix\b|\bfixed\b|\bfixing\b', message, re.IGNORECASE):
-                commit_type = 'fix'
-            elif re.search(r'\bimprove\b|\bimproved\b|\bimproving\b', message, re.IGNORECASE):
-                commit_type = 'improve'
-            elif re.search(r'\bdocument\b|\bdocumentation\b', message, re.IGNORECASE):
-                commit_type = 'document'
-            elif re.search(r'\badd\b|\bfeature\b|\bimplemented\b', message, re.IGNORECASE):
-                commit_type = 'feature'
+            if any(keyword in lowered for keyword in COMMIT_TYPE_KEYWORDS):
+                matched_types = {match.lastgroup for match in COMMIT_TYPE_RE.finditer(lowered)}
+                commit_type = next((t for t in COMMIT_TYPES if t in matched_types), commit_type)
                 
             if is_auto:
                 auto_commit_count += 1
@@ -167,22 +318,25 @@ def analyze_git_history():
                 manual_commit_count += 1
                 
             commit_by_type[commit_type] += 1
+            total_commit_count += 1
+            
+            # Commits arrive newest first, so only the first ones need recording
+            if len(recent_commits) < RECENT_LIMIT:
+                recent_commits.append({
+                    'hash': commit_hash,
+                    'author': author,
+                    'date': date,
+                    'message': message,
+                    'is_auto': is_auto,
+                    'type': commit_type
+                })
             
-            commits.append({
-                'hash': commit_hash,
-                'author': author,
-                'date': date,
-                'message': message,
-                'is_auto': is_auto,
-                'type': commit_type
-            })
-        
         return {
-            'total_commits': len(commits),
+            'total_commits': total_commit_count,
             'auto_commits': auto_commit_count,
             'manual_commits': manual_commit_count,
             'commit_by_type': commit_by_type,
-            'recent_commits': commits[:20]  # Keep only the 20 most recent commits
+            'recent_commits': recent_commits
         }
         
     except Exception as e:
@@ -201,59 +355,48 @@ def analyze_git_history():
             'recent_commits': []
         }
 
+def _count_lines(path):
+    """Count the lines in a file by reading it in large binary chunks"""
+    lines = 0
+    last = b''
+    with open(path, 'rb', buffering=LINE_COUNT_CHUNK_SIZE) as f:
+        while chunk := f.read(LINE_COUNT_CHUNK_SIZE):
+            lines += chunk.count(b'\n')
+            last = chunk
+    # A final line without a trailing newline still counts, as it does when iterating the file
+    if last and not last.endswith(b'\n'):
+        lines += 1
+    return lines
+
 def count_files_and_lines():
     """Count the number of files and lines of code in the repository"""
     try:
-        result = {}
-        
-        # Count Java files
-        java_files = subprocess.run(
-            ['find', '.', '-name', '*.java', '-type', 'f', '-not', '-path', '*/\\.*'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        java_file_list = java_files.stdout.strip().split('\n')
-        java_file_count = len([f for f in java_file_list if f])
-        
-        # Count lines in Java files
-        java_lines = 0
-        for file in java_file_list:
-            if not file:
-                continue
-                
-            with open(file, 'r', encoding='utf-8', errors='ignore') as f:
-                java_lines += sum(1 for _ in f)
-        
-        # Count XML files
-        xml_files = subprocess.run(
-            ['find', '.', '-name', '*.xml', '-type', 'f', '-not', '-path', '*/\\.*'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        xml_file_list = xml_files.stdout.strip().split('\n')
-        xml_file_count = len([f for f in xml_file_list if f])
-        
-        # Total file count
-        total_files = subprocess.run(
-            ['find', '.', '-type', 'f', '-not', '-path', '*/\\.*', '-not', '-path', '*/build/*', '-not', '-path', '*/out/*'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        total_file_list = total_files.stdout.strip().split('\n')
-        total_file_count = len([f for f in total_file_list if f])
-        
         result = {
-            'total_files': total_file_count,
-            'java_files': java_file_count,
-            'xml_files': xml_file_count,
-            'java_lines': java_lines
+            'total_files': 0,
+            'java_files': 0,
+            'xml_files': 0,
+            'java_lines': 0
         }
+        java_file_list = []
+        
+        # Walk the repository once, skipping hidden and build output directories
+        for root, dirs, files in os.walk('.'):
+            dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS and not d.startswith('.')]
+            
+            for name in files:
+                if name.startswith('.'):
+                    continue
+                    
+                result['total_files'] += 1
+                counter = FILE_TYPE_COUNTERS.get(os.path.splitext(name)[1])
+                if counter:
+                    result[counter] += 1
+                    if counter == 'java_files':
+                        java_file_list.append(os.path.join(root, name))
+        
+        # Count lines in Java files concurrently, the reads and byte counting release the GIL
+        with ThreadPoolExecutor(max_workers=LINE_COUNT_WORKERS) as executor:
+            result['java_lines'] = sum(executor.map(_count_lines, java_file_list))
         
         return result
         
@@ -266,32 +409,55 @@ def count_files_and_lines():
             'java_lines': 0
         }
 
+def _input_fingerprint():
+    """Fingerprint the statistics inputs: HEAD, the day the history window ends, and the workflow data files"""
+    head = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    
+    fingerprint = hashlib.blake2b(digest_size=16)
+    fingerprint.update(f"{head}|{datetime.now():%Y-%m-%d}".encode('utf-8'))
+    for path in sorted(_list_workflow_files('.json')):
+        stat = os.stat(path)
+        fingerprint.update(str((os.path.basename(path), stat.st_mtime_ns, stat.st_size)).encode('utf-8'))
+    return fingerprint.hexdigest()
+
 def compile_statistics():
     """Compile all statistics into a single JSON file"""
     try:
         # Make sure the data directory exists
         os.makedirs(DATA_DIR, exist_ok=True)
         
-        # Load workflow statistics
-        workflow_stats = load_workflow_data()
-        
-        # Analyze git history
-        git_stats = analyze_git_history()
+        # Skip regeneration when the previous output was built from the same inputs
+        fingerprint = _input_fingerprint()
+        try:
+            with open(STATS_FILE, 'rb') as f:
+                if _loads(f.read()).get('_fingerprint') == fingerprint:
+                    logger.info("Inputs unchanged, keeping existing automation statistics")
+                    return
+        except (OSError, ValueError):
+            pass
         
-        # Count files and lines
-        file_stats = count_files_and_lines()
+        # Load workflow statistics, analyze git history, and count files and lines concurrently
+        # since each phase reads a different source
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            workflow_future = executor.submit(load_workflow_data)
+            git_future = executor.submit(analyze_git_history)
+            file_future = executor.submit(count_files_and_lines)
+            workflow_stats, git_stats, file_stats = workflow_future.result(), git_future.result(), file_future.result()
         
         # Compile all statistics
         stats = {
             'generated_at': datetime.now().isoformat(),
             'workflow_stats': workflow_stats,
             'git_stats': git_stats,
-            'file_stats': file_stats
+            'file_stats': file_stats,
+            '_fingerprint': fingerprint
         }
         
-        # Write to JSON file
-        with open(DATA_DIR / 'automation_stats.json', 'w') as f:
-            json.dump(stats, f, indent=2)
+        # Write to JSON file in a single write, replacing the old file atomically so readers never see partial output
+        temp_file = STATS_FILE.with_name(STATS_FILE.name + '.tmp')
+        with open(temp_file, 'wb') as f:
+            f.write(_dumps(stats))
+        os.replace(temp_file, STATS_FILE)
             
         logger.info("Successfully compiled automation statistics")
         
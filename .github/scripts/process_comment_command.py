@@ -18,9 +18,16 @@ import os
 import re
 import sys
 import json
+import random
+import asyncio
+import hashlib
 import logging
 import subprocess
+import importlib.util
+from collections import defaultdict
+from dataclasses import dataclass
 from pathlib import Path
+import httpx
 import openai
 
 # Configure logging
@@ -36,6 +43,16 @@ if not openai.api_key:
     logger.error("OPENAI_API_KEY not found in environment variables")
     sys.exit(1)
 
+# One pooled HTTP client for the whole run so requests share connections (multiplexed over HTTP/2 when h2 is installed)
+_http = httpx.AsyncClient(
+    http2=importlib.util.find_spec('h2') is not None,
+    timeout=httpx.Timeout(60.0),
+    limits=httpx.Limits(max_connections=8, max_keepalive_connections=8)
+)
+
+# Retries are handled by _complete so the backoff also covers queued requests
+client = openai.AsyncOpenAI(api_key=openai.api_key, max_retries=0, http_client=_http)
+
 # Get comment details from environment variables
 COMMENT_BODY = os.environ.get('COMMENT_BODY', '')
 ISSUE_NUMBER = os.environ.get('ISSUE_NUMBER', '0')
@@ -47,17 +64,77 @@ PR_NUMBER = os.environ.get('PR_NUMBER', '0')
 # Root directory of the project
 ROOT_DIR = Path(__file__).parent.parent.parent
 SRC_DIR = ROOT_DIR / 'src'
-JAVA_SRC_DIR = SRC_DIR / 'main' / 'java' / 'com' / 'modforge' / 'intellij' / 'plugin'
+JAVA_ROOT_DIR = SRC_DIR / 'main' / 'java'
+JAVA_SRC_DIR = JAVA_ROOT_DIR / 'com' / 'modforge' / 'intellij' / 'plugin'
 RESOURCES_DIR = SRC_DIR / 'main' / 'resources'
+CACHE_DIR = ROOT_DIR / '.modforge_llm_cache'
 RESPONSE_FILE = Path('comment_response.txt')
 
-# Command regex patterns
-FIX_PATTERN = r'/fix\s+(?:"([^"]+)"|([^\s"]+))'
-IMPROVE_PATTERN = r'/improve\s+(?:"([^"]+)"|([^\s"]+))'
-DOCUMENT_PATTERN = r'/document\s+(?:"([^"]+)"|([^\s"]+))'
-ADD_PATTERN = r'/add\s+(?:"([^"]+)"|([^\s"]+))\s+to\s+(?:"([^"]+)"|([^\s"]+))'
-EXPLAIN_PATTERN = r'/explain\s+(?:"([^"]+)"|([^\s"]+))'
-HELP_PATTERN = r'/help'
+# Maximum number of commands (and so OpenAI requests) processed at once
+MAX_CONCURRENT_COMMANDS = 8
+MAX_RETRIES = 5
+
+# Model used for each command, read-only and additive commands run on the faster, cheaper model
+MODEL_BY_CMD = {
+    "fix": "gpt-4o",
+    "improve": "gpt-4o",
+    "add": "gpt-4o",
+    "document": "gpt-4o-mini",
+    "explain": "gpt-4o-mini",
+}
+
+# Command regex pattern, one alternative per command shape so a comment is scanned in a single pass
+COMMAND_RE = re.compile(
+    r'/(?P<command>fix|improve|document|explain)\s+(?:"(?P<target_quoted>[^"]+)"|(?P<target>[^\s"]+))'
+    r'|/add\s+(?:"(?P<feature_quoted>[^"]+)"|(?P<feature>[^\s"]+))\s+to\s+(?:"(?P<add_target_quoted>[^"]+)"|(?P<add_target>[^\s"]+))'
+    r'|(?P<help>/help)'
+)
+
+# Markdown code block wrapping code returned by the AI
+CODE_FENCE_RE = re.compile(r'```(?:java)?\n(.*?)\n```', re.DOTALL)
+
+@dataclass(slots=True)
+class Command:
+    """A command parsed from a comment"""
+    kind: str
+    target: str | None = None
+    feature: str | None = None
+    resolved: Path | None = None
+
+def _unchanged(content, code):
+    """Check whether AI-returned code matches the file, ignoring trailing whitespace"""
+    return content.rstrip() == code.rstrip()
+
+def _extract_code(text):
+    """Pull the Java source out of a JSON-mode response, falling back to a fenced code block"""
+    try:
+        code = json.loads(text)["code"]
+    except (ValueError, KeyError, TypeError):
+        code_match = CODE_FENCE_RE.search(text)
+        if not code_match:
+            raise ValueError("AI response contained neither a JSON 'code' field nor a code block")
+        return code_match.group(1)
+    if not isinstance(code, str):
+        raise ValueError("AI response 'code' field is not a string")
+    return code
+
+async def _stream_completion(model, messages, **options):
+    """Stream a chat completion and return the full response text"""
+    stream = await client.chat.completions.create(model=model, messages=messages, stream=True, **options)
+    chunks = []
+    finish_reason = None
+    try:
+        async for chunk in stream:
+            if chunk.choices:
+                chunks.append(chunk.choices[0].delta.content or "")
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+    finally:
+        await stream.close()
+        
+    # A reply cut off at the token limit is incomplete code (or unterminated JSON), never usable as is
+    if finish_reason == "length":
+        raise ValueError("AI response was cut off at the token limit")
+    return "".join(chunks)
 
 class CommandProcessor:
     def __init__(self, comment_body, issue_number, is_pr):
@@ -65,6 +142,20 @@ class CommandProcessor:
         self.issue_number = issue_number
         self.is_pr = is_pr
         self.changes_made = []
+        self._staged_paths = []
+        self._found_files = {}
+        self._contents = {}
+        self._file_index = {}
+        self._source_files = self._walk_source_files()
+        self.semaphore = None
+        self._handlers = {
+            "fix": self._fix_code,
+            "improve": self._improve_code,
+            "document": self._document_code,
+            "add": self._add_feature,
+            "explain": self._explain_code,
+            "help": self._show_help,
+        }
         
     def process(self):
         """Process the comment for commands"""
@@ -77,115 +168,112 @@ class CommandProcessor:
             logger.info("No valid commands found in comment")
             return
             
-        # Process each command
-        results = []
-        for cmd_type, args in commands:
-            logger.info(f"Processing command: {cmd_type} with args: {args}")
-            result = self._execute_command(cmd_type, args)
-            results.append((cmd_type, args, result))
+        # Process the commands on the event loop
+        results = asyncio.run(self._execute_commands(commands))
             
         # Respond with results
         self._respond_with_results(results)
         
-    def _extract_commands(self):
-        """Extract all commands from the comment"""
-        commands = []
+        # Stage all changed files with a single git invocation
+        if self._staged_paths:
+            subprocess.run(["git", "add", "--", *self._staged_paths], check=True)
         
-        # Check for fix command
-        fix_matches = re.finditer(FIX_PATTERN, self.comment_body)
-        for match in fix_matches:
-            target = match.group(1) if match.group(1) else match.group(2)
-            commands.append(("fix", target))
-            
-        # Check for improve command
-        improve_matches = re.finditer(IMPROVE_PATTERN, self.comment_body)
-        for match in improve_matches:
-            target = match.group(1) if match.group(1) else match.group(2)
-            commands.append(("improve", target))
-            
-        # Check for document command
-        document_matches = re.finditer(DOCUMENT_PATTERN, self.comment_body)
-        for match in document_matches:
-            target = match.group(1) if match.group(1) else match.group(2)
-            commands.append(("document", target))
+    async def _execute_commands(self, commands):
+        """Execute commands, running those on the same target in order and different targets concurrently"""
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS)
+        
+        # Group by the file a target resolves to, so different spellings of one file still run in order
+        targets = defaultdict(list)
+        for index, command in enumerate(commands):
+            targets[command.resolved or command.target].append(index)
             
-        # Check for add command
-        add_matches = re.finditer(ADD_PATTERN, self.comment_body)
-        for match in add_matches:
-            feature = match.group(1) if match.group(1) else match.group(2)
-            target = match.group(3) if match.group(3) else match.group(4)
-            commands.append(("add", {"feature": feature, "target": target}))
+        results = [None] * len(commands)
+        
+        async def process_target(indices):
+            for index in indices:
+                command = commands[index]
+                logger.info(f"Processing command: {command}")
+                results[index] = (command, await self._execute_command(command))
+                
+        try:
+            await asyncio.gather(*(process_target(indices) for indices in targets.values()))
+        finally:
+            await _http.aclose()
+        return results
+        
+    def _extract_commands(self):
+        """Extract all commands from the comment"""
+        # Every command starts with a slash, so most chatter comments need no regex work at all
+        if '/' not in self.comment_body:
+            return []
             
-        # Check for explain command
-        explain_matches = re.finditer(EXPLAIN_PATTERN, self.comment_body)
-        for match in explain_matches:
-            target = match.group(1) if match.group(1) else match.group(2)
-            commands.append(("explain", target))
+        # Keyed by (kind, target, feature) so a repeated command only runs once
+        unique = {}
+        show_help = False
+        
+        # Scan the comment once, dispatching on whichever command matched
+        for match in COMMAND_RE.finditer(self.comment_body):
+            if match.group('help'):
+                show_help = True
+            elif match.group('command'):
+                kind = match.group('command')
+                target = match.group('target_quoted') or match.group('target')
+                unique.setdefault((kind, target, None), Command(kind, target))
+            else:
+                feature = match.group('feature_quoted') or match.group('feature')
+                target = match.group('add_target_quoted') or match.group('add_target')
+                unique.setdefault(("add", target, feature), Command("add", target, feature))
+                
+        commands = list(unique.values())
+        
+        # Resolve each target once up front, handlers look again only if it didn't exist yet
+        for command in commands:
+            command.resolved = self._find_file(command.target)
             
-        # Check for help command
-        if re.search(HELP_PATTERN, self.comment_body):
-            commands.append(("help", None))
+        # Help is shown once, after the other commands
+        if show_help:
+            commands.append(Command("help"))
             
         return commands
     
-    def _execute_command(self, cmd_type, args):
+    async def _execute_command(self, command):
         """Execute a command"""
+        handler = self._handlers.get(command.kind)
+        if handler is None:
+            return f"Unknown command type: {command.kind}"
+            
         try:
-            if cmd_type == "fix":
-                return self._fix_code(args)
-            elif cmd_type == "improve":
-                return self._improve_code(args)
-            elif cmd_type == "document":
-                return self._document_code(args)
-            elif cmd_type == "add":
-                return self._add_feature(args["feature"], args["target"])
-            elif cmd_type == "explain":
-                return self._explain_code(args)
-            elif cmd_type == "help":
-                return self._show_help()
-            else:
-                return f"Unknown command type: {cmd_type}"
+            return await handler(command)
         except Exception as e:
-            logger.error(f"Error executing command {cmd_type}: {e}")
+            logger.error(f"Error executing command {command.kind}: {e}")
             return f"Error: {str(e)}"
     
-    def _fix_code(self, target):
+    async def _fix_code(self, command):
         """Fix issues in a file or component"""
-        target_path = self._find_file(target)
+        target = command.target
+        target_path = command.resolved or self._find_file(target)
         if not target_path:
             return f"Could not find target file: {target}"
             
         try:
             # Read the file
-            with open(target_path, 'r') as f:
-                content = f.read()
+            content = self._read(target_path)
                 
             # Use AI to fix the code
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert Java developer specialized in IntelliJ plugin development. Your task is to fix issues in code without changing its functionality."},
-                    {"role": "user", "content": f"Fix any issues or bugs in this code file, focusing on correctness, performance, and best practices:\n\n```java\n{content}\n```\n\nProvide only the corrected code without explanations."}
-                ]
-            )
-            
-            fixed_code = response.choices[0].message['content']
-            
-            # Extract just the code if it's wrapped in markdown
-            code_match = re.search(r'```(?:java)?\n(.*?)\n```', fixed_code, re.DOTALL)
-            if code_match:
-                fixed_code = code_match.group(1)
+            fixed_code = await self._complete([
+                {"role": "system", "content": "You are an expert Java developer specialized in IntelliJ plugin development. Your task is to fix issues in code without changing its functionality. Respond with a JSON object whose only key, 'code', holds the complete Java source."},
+                {"role": "user", "content": f"Fix any issues or bugs in this code file, focusing on correctness, performance, and best practices:\n\n```java\n{content}\n```\n\nProvide only the corrected code without explanations."}
+            ], MODEL_BY_CMD["fix"], accept=_extract_code, response_format={"type": "json_object"})
                 
             # Check if anything actually changed
-            if fixed_code == content:
+            if _unchanged(content, fixed_code):
                 return f"No issues found in {target}"
                 
             # Write the fixed code back to the file
-            with open(target_path, 'w') as f:
-                f.write(fixed_code)
+            self._write(target_path, fixed_code)
                 
-            # Stage the changes
-            subprocess.run(["git", "add", target_path], check=True)
+            # Queue the file for staging
+            self._staged_paths.append(str(target_path))
             
             self.changes_made.append(f"Fixed issues in {target}")
             return f"Successfully fixed issues in {target}"
@@ -194,43 +282,32 @@ class CommandProcessor:
             logger.error(f"Error fixing {target}: {e}")
             return f"Failed to fix {target}: {str(e)}"
     
-    def _improve_code(self, target):
+    async def _improve_code(self, command):
         """Improve code quality in a file"""
-        target_path = self._find_file(target)
+        target = command.target
+        target_path = command.resolved or self._find_file(target)
         if not target_path:
             return f"Could not find target file: {target}"
             
         try:
             # Read the file
-            with open(target_path, 'r') as f:
-                content = f.read()
+            content = self._read(target_path)
                 
             # Use AI to improve the code
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert Java developer specialized in IntelliJ plugin development. Your task is to improve code quality without changing functionality."},
-                    {"role": "user", "content": f"Improve the quality of this code file while preserving its functionality. Focus on readability, maintainability, and performance:\n\n```java\n{content}\n```\n\nProvide only the improved code without explanations."}
-                ]
-            )
-            
-            improved_code = response.choices[0].message['content']
-            
-            # Extract just the code if it's wrapped in markdown
-            code_match = re.search(r'```(?:java)?\n(.*?)\n```', improved_code, re.DOTALL)
-            if code_match:
-                improved_code = code_match.group(1)
+            improved_code = await self._complete([
+                {"role": "system", "content": "You are an expert Java developer specialized in IntelliJ plugin development. Your task is to improve code quality without changing functionality. Respond with a JSON object whose only key, 'code', holds the complete Java source."},
+                {"role": "user", "content": f"Improve the quality of this code file while preserving its functionality. Focus on readability, maintainability, and performance:\n\n```java\n{content}\n```\n\nProvide only the improved code without explanations."}
+            ], MODEL_BY_CMD["improve"], accept=_extract_code, response_format={"type": "json_object"})
                 
             # Check if anything actually changed
-            if improved_code == content:
+            if _unchanged(content, improved_code):
                 return f"No improvements identified for {target}"
                 
             # Write the improved code back to the file
-            with open(target_path, 'w') as f:
-                f.write(improved_code)
+            self._write(target_path, improved_code)
                 
-            # Stage the changes
-            subprocess.run(["git", "add", target_path], check=True)
+            # Queue the file for staging
+            self._staged_paths.append(str(target_path))
             
             self.changes_made.append(f"Improved code quality in {target}")
             return f"Successfully improved code quality in {target}"
@@ -239,43 +316,32 @@ class CommandProcessor:
             logger.error(f"Error improving {target}: {e}")
             return f"Failed to improve {target}: {str(e)}"
     
-    def _document_code(self, target):
+    async def _document_code(self, command):
         """Generate documentation for a file"""
-        target_path = self._find_file(target)
+        target = command.target
+        target_path = command.resolved or self._find_file(target)
         if not target_path:
             return f"Could not find target file: {target}"
             
         try:
             # Read the file
-            with open(target_path, 'r') as f:
-                content = f.read()
+            content = self._read(target_path)
                 
             # Use AI to document the code
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert Java developer specialized in IntelliJ plugin development. Your task is to add comprehensive JavaDoc documentation to code."},
-                    {"role": "user", "content": f"Add comprehensive JavaDoc documentation to this code file, including class-level docs, method docs, parameter descriptions, and return value descriptions:\n\n```java\n{content}\n```\n\nProvide only the documented code without explanations."}
-                ]
-            )
-            
-            documented_code = response.choices[0].message['content']
-            
-            # Extract just the code if it's wrapped in markdown
-            code_match = re.search(r'```(?:java)?\n(.*?)\n```', documented_code, re.DOTALL)
-            if code_match:
-                documented_code = code_match.group(1)
+            documented_code = await self._complete([
+                {"role": "system", "content": "You are an expert Java developer specialized in IntelliJ plugin development. Your task is to add comprehensive JavaDoc documentation to code. Respond with a JSON object whose only key, 'code', holds the complete Java source."},
+                {"role": "user", "content": f"Add comprehensive JavaDoc documentation to this code file, including class-level docs, method docs, parameter descriptions, and return value descriptions:\n\n```java\n{content}\n```\n\nProvide only the documented code without explanations."}
+            ], MODEL_BY_CMD["document"], accept=_extract_code, response_format={"type": "json_object"})
                 
             # Check if anything actually changed
-            if documented_code == content:
+            if _unchanged(content, documented_code):
                 return f"No documentation changes needed for {target}"
                 
             # Write the documented code back to the file
-            with open(target_path, 'w') as f:
-                f.write(documented_code)
+            self._write(target_path, documented_code)
                 
-            # Stage the changes
-            subprocess.run(["git", "add", target_path], check=True)
+            # Queue the file for staging
+            self._staged_paths.append(str(target_path))
             
             self.changes_made.append(f"Added documentation to {target}")
             return f"Successfully added documentation to {target}"
@@ -284,9 +350,10 @@ class CommandProcessor:
             logger.error(f"Error documenting {target}: {e}")
             return f"Failed to document {target}: {str(e)}"
     
-    def _add_feature(self, feature, target):
+    async def _add_feature(self, command):
         """Add a feature to a component"""
-        target_path = self._find_file(target)
+        feature, target = command.feature, command.target
+        target_path = command.resolved or self._find_file(target)
         new_file = False
         
         if not target_path:
@@ -297,10 +364,7 @@ class CommandProcessor:
                 new_file = True
             else:
                 # It's a package or component name
-                package_path = JAVA_SRC_DIR
-                for part in target.split('.'):
-                    package_path = package_path / part
-                    
+                package_path = JAVA_SRC_DIR.joinpath(*target.split('.'))
                 if not package_path.exists():
                     return f"Could not find target package or component: {target}"
                     
@@ -309,67 +373,53 @@ class CommandProcessor:
                 target_path = package_path / f"{class_name}.java"
                 new_file = True
                 
+        # A new class needs a package, so it has to go in a directory below the Java source root
+        if new_file:
+            java_root = JAVA_ROOT_DIR.resolve()
+            target_path = target_path.resolve()
+            if java_root not in target_path.parent.parents:
+                return f"Target must be inside a package directory under {JAVA_ROOT_DIR}: {target}"
+                
         try:
             if new_file:
                 # Create a new file for the feature
-                package_name = os.path.dirname(target_path).replace(str(JAVA_SRC_DIR), "").replace("/", ".").lstrip(".")
-                if not package_name:
-                    package_name = "com.modforge.intellij.plugin"
-                
-                response = openai.ChatCompletion.create(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": "You are an expert Java developer specialized in IntelliJ plugin development. Your task is to create a new Java class implementing a specific feature."},
-                        {"role": "user", "content": f"Create a new Java class for an IntelliJ plugin that implements the following feature: {feature}\n\nPackage: {package_name}\nClass name: {os.path.basename(target_path).replace('.java', '')}\n\nUse proper JavaDoc, follow IntelliJ platform conventions, and include all necessary imports and implementations."}
-                    ]
-                )
-                
-                new_code = response.choices[0].message['content']
+                package_name = ".".join(target_path.parent.relative_to(java_root).parts)
                 
-                # Extract just the code if it's wrapped in markdown
-                code_match = re.search(r'```(?:java)?\n(.*?)\n```', new_code, re.DOTALL)
-                if code_match:
-                    new_code = code_match.group(1)
+                new_code = await self._complete([
+                    {"role": "system", "content": "You are an expert Java developer specialized in IntelliJ plugin development. Your task is to create a new Java class implementing a specific feature. Respond with a JSON object whose only key, 'code', holds the complete Java source."},
+                    {"role": "user", "content": f"Create a new Java class for an IntelliJ plugin that implements the following feature: {feature}\n\nPackage: {package_name}\nClass name: {target_path.stem}\n\nUse proper JavaDoc, follow IntelliJ platform conventions, and include all necessary imports and implementations."}
+                ], MODEL_BY_CMD["add"], accept=_extract_code, response_format={"type": "json_object"})
                     
                 # Create directory if it doesn't exist
-                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                target_path.parent.mkdir(parents=True, exist_ok=True)
                 
                 # Write the new file
-                with open(target_path, 'w') as f:
-                    f.write(new_code)
+                self._write(target_path, new_code)
                     
-                # Stage the changes
-                subprocess.run(["git", "add", target_path], check=True)
+                # Queue the file for staging
+                self._staged_paths.append(str(target_path))
                 
-                self.changes_made.append(f"Created new file {target_path} implementing {feature}")
-                return f"Successfully created new file {os.path.basename(target_path)} implementing {feature}"
+                self.changes_made.append(f"Created new file {target_path.relative_to(ROOT_DIR.resolve())} implementing {feature}")
+                return f"Successfully created new file {target_path.name} implementing {feature}"
                 
             else:
                 # Add the feature to an existing file
-                with open(target_path, 'r') as f:
-                    content = f.read()
+                content = self._read(target_path)
                     
-                response = openai.ChatCompletion.create(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": "You are an expert Java developer specialized in IntelliJ plugin development. Your task is to add a new feature to an existing class."},
-                        {"role": "user", "content": f"Add the following feature to this existing Java class: {feature}\n\n```java\n{content}\n```\n\nMake sure to maintain the existing code structure and functionality while adding the new feature. Include proper JavaDoc for the new methods. Provide only the complete updated code without explanations."}
-                    ]
-                )
-                
-                updated_code = response.choices[0].message['content']
-                
-                # Extract just the code if it's wrapped in markdown
-                code_match = re.search(r'```(?:java)?\n(.*?)\n```', updated_code, re.DOTALL)
-                if code_match:
-                    updated_code = code_match.group(1)
+                updated_code = await self._complete([
+                    {"role": "system", "content": "You are an expert Java developer specialized in IntelliJ plugin development. Your task is to add a new feature to an existing class. Respond with a JSON object whose only key, 'code', holds the complete Java source."},
+                    {"role": "user", "content": f"Add the following feature to this existing Java class: {feature}\n\n```java\n{content}\n```\n\nMake sure to maintain the existing code structure and functionality while adding the new feature. Include proper JavaDoc for the new methods. Provide only the complete updated code without explanations."}
+                ], MODEL_BY_CMD["add"], accept=_extract_code, response_format={"type": "json_object"})
+                    
+                # Check if anything actually changed
+                if _unchanged(content, updated_code):
+                    return f"No changes needed to add feature {feature} to {target}"
                     
                 # Write the updated code back to the file
-                with open(target_path, 'w') as f:
-                    f.write(updated_code)
+                self._write(target_path, updated_code)
                     
-                # Stage the changes
-                subprocess.run(["git", "add", target_path], check=True)
+                # Queue the file for staging
+                self._staged_paths.append(str(target_path))
                 
                 self.changes_made.append(f"Added feature {feature} to {target}")
                 return f"Successfully added feature {feature} to {target}"
@@ -378,27 +428,22 @@ class CommandProcessor:
             logger.error(f"Error adding feature {feature} to {target}: {e}")
             return f"Failed to add feature {feature} to {target}: {str(e)}"
     
-    def _explain_code(self, target):
+    async def _explain_code(self, command):
         """Explain how a file or component works"""
-        target_path = self._find_file(target)
+        target = command.target
+        target_path = command.resolved or self._find_file(target)
         if not target_path:
             return f"Could not find target file: {target}"
             
         try:
             # Read the file
-            with open(target_path, 'r') as f:
-                content = f.read()
+            content = self._read(target_path)
                 
             # Use AI to explain the code
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert Java developer specialized in IntelliJ plugin development. Your task is to explain code in a clear, concise way."},
-                    {"role": "user", "content": f"Explain how this code works, focusing on its purpose, key components, and how it integrates with the rest of the system:\n\n```java\n{content}\n```\n\nProvide a clear, educational explanation suitable for a developer joining the project."}
-                ]
-            )
-            
-            explanation = response.choices[0].message['content']
+            explanation = await self._complete([
+                {"role": "system", "content": "You are an expert Java developer specialized in IntelliJ plugin development. Your task is to explain code in a clear, concise way."},
+                {"role": "user", "content": f"Explain how this code works, focusing on its purpose, key components, and how it integrates with the rest of the system:\n\n```java\n{content}\n```\n\nProvide a clear, educational explanation suitable for a developer joining the project."}
+            ], MODEL_BY_CMD["explain"])
             
             # No changes to the file, just return the explanation
             return f"## Explanation of `{target}`\n\n{explanation}"
@@ -407,7 +452,7 @@ class CommandProcessor:
             logger.error(f"Error explaining {target}: {e}")
             return f"Failed to explain {target}: {str(e)}"
     
-    def _show_help(self):
+    async def _show_help(self, command):
         """Show available commands"""
         help_text = """## Available Commands
 
@@ -435,73 +480,136 @@ The system will process your command and respond with the results in a comment.
         return help_text
     
     def _find_file(self, target):
-        """Find a file based on a target specification"""
+        """Find a file based on a target specification, remembering files already found"""
+        path = self._found_files.get(target)
+        if path is None:
+            path = self._locate_file(target)
+            # Misses aren't remembered, /add may create the file later in the run
+            if path is not None:
+                # Canonical, so every spelling of a target maps to the same path
+                path = self._found_files[target] = path.resolve()
+        return path
+    
+    def _locate_file(self, target):
+        """Locate a file based on a target specification"""
         # Check if it's a direct path
-        if os.path.exists(target) and os.path.isfile(target):
-            return target
+        path = Path(target)
+        if path.is_file():
+            return path
             
         # Check if it's a path relative to the Java source directory
         java_path = JAVA_SRC_DIR / target
-        if java_path.exists() and java_path.is_file():
+        if java_path.is_file():
             return java_path
             
         # Check if it's a class name without .java extension
         if not target.endswith('.java'):
             class_path = JAVA_SRC_DIR / f"{target}.java"
-            if class_path.exists() and class_path.is_file():
+            if class_path.is_file():
                 return class_path
             
         # Check if it's a fully qualified class name
         if '.' in target:
             parts = target.split('.')
-            class_name = parts[-1]
-            package_path = JAVA_SRC_DIR
-            
-            for part in parts[:-1]:
-                package_path = package_path / part
-                
-            class_path = package_path / f"{class_name}.java"
-            if class_path.exists() and class_path.is_file():
+            class_path = JAVA_SRC_DIR.joinpath(*parts[:-1], f"{parts[-1]}.java")
+            if class_path.is_file():
                 return class_path
             
-        # Recursive search for the file
-        for root, _, files in os.walk(JAVA_SRC_DIR):
-            for file in files:
-                if file == target or file == f"{target}.java":
-                    return os.path.join(root, file)
+        # Search the source tree by file name, indexing files as the walk reaches them
+        names = (target, f"{target}.java")
+        if not any(name in self._file_index for name in names):
+            for name, path in self._source_files:
+                self._file_index.setdefault(name, path)
+                if name in names:
+                    break
                     
-        return None
+        path = self._file_index.get(target) or self._file_index.get(f"{target}.java")
+        return Path(path) if path else None
+    
+    def _walk_source_files(self):
+        """Lazily yield (name, path) for files in the Java source tree, in os.walk order"""
+        stack = [JAVA_SRC_DIR]
+        while stack:
+            subdirs = []
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        # The dirent type answers these without a stat call
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file():
+                            yield entry.name, entry.path
+            except OSError:
+                continue
+            stack.extend(reversed(subdirs))
+    
+    def _read(self, path):
+        """Read a file, reusing its content if an earlier command already read or wrote it"""
+        content = self._contents.get(path)
+        if content is None:
+            content = self._contents[path] = path.read_text(encoding='utf-8')
+        return content
+    
+    def _write(self, path, content):
+        """Write a file and remember its new content for later commands"""
+        path.write_text(content, encoding='utf-8')
+        self._contents[path] = content
+    
+    async def _complete(self, messages, model, accept=None, **options):
+        """Send a streamed chat completion request with jittered retries, returning accept(reply) if given and caching only accepted replies"""
+        # Identical prompts get identical answers from the on-disk cache
+        key = hashlib.sha256((model + json.dumps([messages, options], sort_keys=True)).encode('utf-8')).hexdigest()
+        cache_file = CACHE_DIR / key[:2] / key
+        cached = cache_file.exists()
+        if cached:
+            logger.info(f"Using cached AI response {key[:12]}")
+            content = cache_file.read_text(encoding='utf-8')
+        else:
+            async with self.semaphore:
+                for attempt in range(MAX_RETRIES):
+                    try:
+                        content = await _stream_completion(model, messages, **options)
+                        break
+                    except (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError) as e:
+                        if attempt == MAX_RETRIES - 1:
+                            raise
+                        delay = 2 ** attempt + random.random()
+                        logger.warning(f"OpenAI request failed ({e}), retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
+                        
+        # Only accepted replies are kept, so re-issuing a command after a bad reply asks again
+        try:
+            result = accept(content) if accept else content
+        except Exception:
+            if cached:
+                cache_file.unlink(missing_ok=True)
+            raise
+            
+        if not cached:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(content, encoding='utf-8')
+        return result
     
     def _respond_with_results(self, results):
         """Generate a response with the results of all commands"""
-        response = []
-        response.append(f"## ModForge Automation Response")
-        response.append("")
+        sections = ["## ModForge Automation Response\n"]
         
-        for cmd_type, args, result in results:
-            if cmd_type == "add":
-                args_str = f"{args['feature']} to {args['target']}"
+        for command, result in results:
+            if command.kind == "add":
+                args_str = f"{command.feature} to {command.target}"
             else:
-                args_str = str(args) if args else ""
+                args_str = command.target or ""
                 
-            response.append(f"### Command: `/{cmd_type} {args_str}`")
-            response.append("")
-            response.append(result)
-            response.append("")
+            sections.append(f"### Command: `/{command.kind} {args_str}`\n\n{result}\n")
             
         if self.changes_made:
-            response.append("### Changes Made")
-            response.append("")
-            for change in self.changes_made:
-                response.append(f"- ✅ {change}")
-            response.append("")
+            changes = "\n".join(f"- ✅ {change}" for change in self.changes_made)
+            sections.append(f"### Changes Made\n\n{changes}\n")
             
-        response.append("---")
-        response.append("*Executed by ModForge Automation System*")
+        sections.append("---\n*Executed by ModForge Automation System*")
         
         # Write the response to the file
-        with open(RESPONSE_FILE, 'w') as f:
-            f.write("\n".join(response))
+        RESPONSE_FILE.write_text("\n".join(sections), encoding='utf-8')
             
         logger.info("Response prepared")
 
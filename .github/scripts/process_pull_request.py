@@ -40,6 +40,9 @@ JAVA_SRC_DIR = SRC_DIR / 'main' / 'java' / 'com' / 'modforge' / 'intellij' / 'pl
 RESOURCES_DIR = SRC_DIR / 'main' / 'resources'
 RESPONSE_FILE = Path('pr_response.txt')
 
+# File types the AI may rewrite, other changed files are only analyzed
+IMPROVABLE_EXTENSIONS = {'java', 'xml', 'gradle'}
+
 class PullRequestProcessor:
     def __init__(self, pr_title, pr_body, pr_number):
         self.pr_title = pr_title
@@ -59,11 +62,8 @@ class PullRequestProcessor:
             self._respond("No changed files found in this pull request.")
             return
             
-        # Analyze the changes
-        self._analyze_changes(changed_files)
-        
-        # Generate improvements and fix issues
-        self._improve_code(changed_files)
+        # Analyze the changes and apply improvements in a single pass
+        self._review_changes(changed_files)
         
         # Report back with suggestions and changes
         self._generate_report()
@@ -91,22 +91,21 @@ class PullRequestProcessor:
             logger.error(f"Failed to get changed files: {e}")
             return []
             
-    def _analyze_changes(self, changed_files):
-        """Analyze the changes in the PR"""
-        logger.info("Analyzing changes in pull request")
+    def _review_changes(self, changed_files):
+        """Analyze the changes in the PR and apply improvements with one AI request per file"""
+        logger.info("Reviewing changes in pull request")
         
         pr_analysis = {}
         
-        try:
-            # Combine PR title and body for context
-            pr_context = f"PR Title: {self.pr_title}\nPR Body: {self.pr_body}"
-            
-            # For each changed file, get a diff and analyze it
-            for file_path in changed_files:
-                if not os.path.exists(file_path):
-                    logger.warning(f"File {file_path} does not exist")
-                    continue
+        # Combine PR title and body for context
+        pr_context = f"PR Title: {self.pr_title}\nPR Body: {self.pr_body}"
+        
+        for file_path in changed_files:
+            if not os.path.exists(file_path):
+                logger.warning(f"File {file_path} does not exist")
+                continue
                 
+            try:
                 # Get the diff for this file
                 diff_result = subprocess.run(
                     ["git", "diff", "origin/main", "--", file_path],
@@ -120,84 +119,48 @@ class PullRequestProcessor:
                 # Read the current content of the file
                 with open(file_path, 'r') as f:
                     content = f.read()
-                
-                # Analyze the changes using AI
-                try:
-                    response = openai.ChatCompletion.create(
-                        model="gpt-4",
-                        messages=[
-                            {"role": "system", "content": "You are a Java developer specialized in IntelliJ plugin development. Analyze code changes in pull requests and provide insights."},
-                            {"role": "user", "content": f"Analyze these changes in file {file_path}:\n\nPR Context:\n{pr_context}\n\nDiff:\n```diff\n{diff}\n```\n\nCurrent content:\n```\n{content}\n```\n\nProvide your analysis in JSON format with these fields: 'potential_issues' (array), 'suggestions' (array), 'code_quality' (1-5), and 'needs_improvement' (boolean)."}
-                        ]
-                    )
-                    
-                    # Extract and parse the response
-                    analysis_text = response.choices[0].message['content']
-                    
-                    # Try to extract JSON from the response
-                    json_match = re.search(r'```json\n(.*?)\n```', analysis_text, re.DOTALL)
-                    if json_match:
-                        analysis_json = json.loads(json_match.group(1))
-                    else:
-                        # Try without markdown formatting
-                        analysis_json = json.loads(analysis_text)
-                    
-                    # Store the analysis for this file
-                    pr_analysis[file_path] = analysis_json
-                    
-                    # Collect suggestions
-                    if 'suggestions' in analysis_json:
-                        for suggestion in analysis_json['suggestions']:
-                            self.suggestions.append(f"{file_path}: {suggestion}")
-                    
-                    logger.info(f"Completed analysis of {file_path}")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to analyze {file_path}: {e}")
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"Failed to analyze PR changes: {e}")
-            
-        return pr_analysis
-        
-    def _improve_code(self, changed_files):
-        """Make improvements to the code based on analysis"""
-        logger.info("Applying automated improvements to code")
-        
-        for file_path in changed_files:
-            if not os.path.exists(file_path):
-                continue
-                
-            try:
-                # Read the current content
-                with open(file_path, 'r') as f:
-                    content = f.read()
                     
-                file_ext = file_path.split('.')[-1].lower()
+                # Only certain file types get improved code, the rest are analyzed only
+                improvable = file_path.split('.')[-1].lower() in IMPROVABLE_EXTENSIONS
+                response_fields = "- 'analysis': an object with 'potential_issues' (array), 'suggestions' (array), 'code_quality' (1-5), and 'needs_improvement' (boolean)"
+                if improvable:
+                    response_fields += "\n- 'improved_code': the complete file content improved for code quality, style, and best practices while preserving its functionality"
                 
-                # Only process certain file types
-                if file_ext not in ['java', 'xml', 'gradle']:
-                    continue
-                    
-                # Get suggested improvements from AI
+                # Analyze and improve the file with one AI request, on a model that supports JSON mode (base gpt-4 rejects it)
                 response = openai.ChatCompletion.create(
-                    model="gpt-4",
+                    model="gpt-4o",
+                    response_format={"type": "json_object"},
                     messages=[
-                        {"role": "system", "content": "You are a Java developer specialized in IntelliJ plugin development. Make improvements to code while preserving functionality."},
-                        {"role": "user", "content": f"Improve this code in {file_path} while preserving its functionality. Focus on code quality, style, and best practices.\n\nCurrent content:\n```\n{content}\n```\n\nProvide only the improved code without any explanation."}
+                        {"role": "system", "content": "You are a Java developer specialized in IntelliJ plugin development. Analyze code changes in pull requests and make improvements to code while preserving functionality. Always respond with a single JSON object."},
+                        {"role": "user", "content": f"Review the changes in file {file_path}:\n\nPR Context:\n{pr_context}\n\nDiff:\n```diff\n{diff}\n```\n\nCurrent content:\n```\n{content}\n```\n\nRespond with a JSON object with these fields:\n{response_fields}"}
                     ]
                 )
                 
-                improved_code = response.choices[0].message['content']
+                review_text = response.choices[0].message['content']
+                
+                # Try to extract JSON from the response
+                json_match = re.search(r'```json\n(.*?)\n```', review_text, re.DOTALL)
+                if json_match:
+                    review_json = json.loads(json_match.group(1))
+                else:
+                    # Try without markdown formatting
+                    review_json = json.loads(review_text)
+                
+                # Store the analysis for this file
+                analysis_json = review_json.get('analysis', {})
+                pr_analysis[file_path] = analysis_json
+                
+                # Collect suggestions
+                if 'suggestions' in analysis_json:
+                    for suggestion in analysis_json['suggestions']:
+                        self.suggestions.append(f"{file_path}: {suggestion}")
                 
-                # Extract just the code if it's wrapped in markdown
-                code_match = re.search(r'```(?:\w+)?\n(.*?)\n```', improved_code, re.DOTALL)
-                if code_match:
-                    improved_code = code_match.group(1)
+                logger.info(f"Completed analysis of {file_path}")
+                
+                improved_code = review_json.get('improved_code') if improvable else None
                 
                 # Compare the improved code with the original
-                if improved_code != content:
+                if improved_code and improved_code != content:
                     # Write the improved code
                     with open(file_path, 'w') as f:
                         f.write(improved_code)
@@ -209,7 +172,10 @@ class PullRequestProcessor:
                     logger.info(f"Improved code in {file_path}")
                     
             except Exception as e:
-                logger.error(f"Failed to improve {file_path}: {e}")
+                logger.error(f"Failed to review {file_path}: {e}")
+                continue
+                
+        return pr_analysis
     
     def _generate_report(self):
         """Generate a report of changes and suggestions"""
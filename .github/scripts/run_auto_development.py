@@ -13,11 +13,42 @@ import os
 import re
 import sys
 import json
+import mmap
+import random
+import asyncio
+import hashlib
 import argparse
 import subprocess
 import logging
+import importlib.util
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import httpx
 import openai
+from unidiff import PatchSet
+
+# Prefer RE2's linear-time matcher for scanning build logs when it is available
+try:
+    import re2 as _re_fast
+except ImportError:
+    _re_fast = re
+
+# NumPy gives a vectorized newline scan for indexing lines in source files
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# SIMD-accelerated hashes for cache keys, falling back to hashlib
+try:
+    from blake3 import blake3 as _prompt_hash
+except ImportError:
+    _prompt_hash = hashlib.sha256
+try:
+    from xxhash import xxh3_64 as _content_hash
+except ImportError:
+    _content_hash = hashlib.sha1
 
 # Configure logging
 logging.basicConfig(
@@ -26,17 +57,51 @@ logging.basicConfig(
 )
 logger = logging.getLogger('ModForge-AutoDev')
 
+# Patterns used to extract the structure of Java source files, AI responses, and build errors
+_SCAN_RE = re.compile(r'package\s+([\w.]+);|(?:public|private)\s+(?:final\s+)?(class|interface|enum)\s+(\w+)')
+_FENCE_RE = re.compile(r'^```[\w-]*\n(.*?)\n```', re.DOTALL)
+_OPEN_FENCE_RE = re.compile(r'(?m)^```[\w-]*\n')
+_ERR_RE = _re_fast.compile(rb'(?m)^(.+?\.java):(\d+): (error|warning): (.*)$')
+
 # Initialize OpenAI API
 openai.api_key = os.environ.get('OPENAI_API_KEY')
 if not openai.api_key:
     logger.error("OPENAI_API_KEY not found in environment variables")
     sys.exit(1)
 
+# One pooled HTTP client for the whole run so requests share connections (multiplexed over HTTP/2 when h2 is installed)
+_http = httpx.AsyncClient(
+    http2=importlib.util.find_spec('h2') is not None,
+    timeout=httpx.Timeout(60.0),
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=64)
+)
+
+# Retries are handled by _ask so the backoff also covers queued requests
+client = openai.AsyncOpenAI(api_key=openai.api_key, max_retries=0, http_client=_http)
+
+# Required fields and types of an AI feature suggestion
+FEATURE_FIELDS = {
+    'feature_name': str,
+    'description': str,
+    'implementation_plan': dict,
+    'priority': int
+}
+
+# Limits for concurrent OpenAI requests
+MAX_CONCURRENT_REQUESTS = 8
+MAX_RETRIES = 5
+
 # Parse arguments
 parser = argparse.ArgumentParser(description='Run automated development tasks on ModForge codebase')
 parser.add_argument('--task', type=str, default='fix-errors',
                     choices=['fix-errors', 'improve-code', 'generate-docs', 'add-feature'],
                     help='Type of development task to perform')
+parser.add_argument('--no-cache', action='store_true',
+                    help='Always query the AI instead of reusing cached responses')
+parser.add_argument('--full', action='store_true',
+                    help='Process all files instead of only those changed since the last run')
+parser.add_argument('--max-files', type=int, default=3,
+                    help='Maximum number of files to improve or document per run')
 args = parser.parse_args()
 
 # Root directory of the project
@@ -44,12 +109,223 @@ ROOT_DIR = Path(__file__).parent.parent.parent
 SRC_DIR = ROOT_DIR / 'src'
 JAVA_SRC_DIR = SRC_DIR / 'main' / 'java' / 'com' / 'modforge' / 'intellij' / 'plugin'
 RESOURCES_DIR = SRC_DIR / 'main' / 'resources'
+CACHE_DIR = ROOT_DIR / '.modforge_llm_cache'
+STATE_FILE = ROOT_DIR / '.modforge_state.json'
+
+def _iter_java(root):
+    """Yield the paths of all Java files under root without stat-ing each directory entry"""
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith('.java'):
+                        yield entry.path
+        except OSError as e:
+            logger.warning(f"Could not list {directory}: {e}")
+
+def _hash_bytes(data):
+    """Return the content hash used to detect changed files"""
+    return _content_hash(data).hexdigest()
+
+def _scan_java(path):
+    """Extract (path, mtime_ns, hash, package, class_name, type) from a Java file, or None if it cannot be read"""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+        with open(path, 'rb') as f:
+            data = f.read()
+        content = data.decode('utf-8', 'replace')
+            
+        # Extract package, class name and type (class, interface, or enum) in a single pass,
+        # stopping at the first class since the package declaration must precede it
+        package, class_name, class_type = "unknown", None, None
+        for match in _SCAN_RE.finditer(content):
+            if match.group(1):
+                package = match.group(1)
+            else:
+                class_type, class_name = match.group(2), match.group(3)
+                break
+        
+        return (path, mtime_ns, _hash_bytes(data), package, class_name, class_type)
+    except Exception as e:
+        logger.error(f"Error processing {path}: {e}")
+        
+    return None
+
+def _fenced_code(text):
+    """Return the body of the complete code block a reply must consist of, rejecting unfenced or unclosed replies"""
+    match = _FENCE_RE.match(text.strip())
+    if not match:
+        raise ValueError("AI response is not a complete fenced code block")
+    return match.group(1)
+
+def _strip_fence(text, keep_newline=False):
+    """Return the body of a markdown code block wrapping the text, or the stripped text itself"""
+    text = text.strip()
+    match = _FENCE_RE.match(text)
+    if not match:
+        # An opening fence with no closing one means the reply was cut off
+        if text.startswith('```'):
+            raise ValueError("AI response has an unclosed code block")
+        return text
+    # Diff lines must keep the newline that ends the block, or the last one would run into the next line
+    return match.group(1) + '\n' if keep_newline else match.group(1)
+
+# Newline offsets per file, reused while the file's mtime and size are unchanged
+_line_offsets_cache = {}
+
+def _line_offsets(file_path, mm):
+    """Return the byte offset of every newline in a mapped file"""
+    stat = os.stat(file_path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _line_offsets_cache.get(file_path)
+    if cached and cached[0] == key:
+        return cached[1]
+        
+    if np is not None:
+        offsets = np.flatnonzero(np.frombuffer(mm, dtype=np.uint8) == 0x0A)
+    else:
+        offsets = [match.start() for match in re.finditer(b'\n', mm)]
+        
+    _line_offsets_cache[file_path] = (key, offsets)
+    return offsets
+
+def _line_range(offsets, size, start_line, end_line):
+    """Return the byte offsets spanning lines [start_line, end_line), clamped to the end of the file"""
+    def line_start(line):
+        if line == 0:
+            return 0
+        if line - 1 < len(offsets):
+            return int(offsets[line - 1]) + 1
+        return size
+        
+    return line_start(start_line), line_start(end_line)
+
+def _apply_unified_diff(file_path, diff_text):
+    """Apply a unified diff to a file, rejecting it unless every hunk matches the current content"""
+    patch = PatchSet(diff_text)
+    if len(patch) != 1:
+        raise ValueError(f"Expected a diff for one file, got {len(patch)}")
+    hunks = sorted(patch[0], key=lambda hunk: hunk.source_start)
+    if not hunks:
+        return 0
+        
+    with open(file_path, 'r+b') as f:
+        with mmap.mmap(f.fileno(), 0) as mm:
+            offsets = _line_offsets(file_path, mm)
+            
+            # Validate every hunk against the file before touching it
+            pieces = []
+            first = position = None
+            for hunk in hunks:
+                # A hunk without source lines inserts after its start line
+                first_line = hunk.source_start if hunk.source_length == 0 else hunk.source_start - 1
+                start, end = _line_range(offsets, len(mm), max(0, first_line), max(0, first_line) + hunk.source_length)
+                if position is not None and start < position:
+                    raise ValueError(f"Overlapping hunk at line {hunk.source_start}")
+                    
+                actual = [line.rstrip() for line in mm[start:end].decode('utf-8').splitlines()]
+                expected = [line.value.rstrip() for line in hunk.source_lines()]
+                if actual != expected:
+                    raise ValueError(f"Hunk at line {hunk.source_start} does not match {file_path}")
+                    
+                if first is None:
+                    first = position = start
+                pieces.append(mm[position:start])
+                
+                # A replacement missing its final newline would be joined onto the line after it
+                replacement = ''.join(line.value for line in hunk.target_lines()).encode('utf-8')
+                if replacement and not replacement.endswith(b'\n') and (mm[start:end].endswith(b'\n') or (start == end < len(mm))):
+                    replacement += b'\n'
+                pieces.append(replacement)
+                position = end
+            pieces.append(mm[position:])
+            
+        # Rewrite the file only from the first patched line
+        f.seek(first)
+        f.write(b''.join(pieces))
+        f.truncate()
+    _line_offsets_cache.pop(file_path, None)
+    return len(hunks)
+
+async def _stream_completion(model, messages, until_fence, **options):
+    """Stream a chat completion, returning early once the first fenced code block is closed"""
+    stream = await client.chat.completions.create(model=model, messages=messages, stream=True, **options)
+    text, opening, scanned = "", None, 0
+    finish_reason = None
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            text += chunk.choices[0].delta.content or ""
+            finish_reason = chunk.choices[0].finish_reason or finish_reason
+            if not until_fence:
+                continue
+                
+            # Find the opening fence first, then only scan the new text for the closing one
+            if opening is None:
+                opening = _OPEN_FENCE_RE.search(text)
+                if opening is None:
+                    continue
+                scanned = opening.end() - 1
+            closing = text.find('\n```', scanned)
+            if closing != -1:
+                # Anything after the block is explanation we would discard anyway
+                return text[opening.start():closing + 4]
+            scanned = max(scanned, len(text) - 3)
+    finally:
+        await stream.close()
+        
+    # A reply cut off at the token limit is incomplete, never usable as is
+    if finish_reason == "length":
+        raise ValueError("AI response was cut off at the token limit")
+    return text
+
+async def _ask(messages, semaphore, model="gpt-4", until_fence=False, accept=None, cache=True, **options):
+    """Send a chat completion request with retries, returning accept(reply) if given and caching only accepted replies"""
+    # Identical prompts get identical answers from the on-disk cache
+    key = _prompt_hash((model + json.dumps([messages, options, until_fence], sort_keys=True)).encode('utf-8')).hexdigest()
+    cache_file = CACHE_DIR / key[:2] / key
+    cached = cache and not args.no_cache and cache_file.exists()
+    if cached:
+        logger.info(f"Using cached AI response {key[:12]}")
+        content = cache_file.read_text(encoding='utf-8')
+    else:
+        async with semaphore:
+            for attempt in range(MAX_RETRIES):
+                try:
+                    content = await _stream_completion(model, messages, until_fence, **options)
+                    break
+                except (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError) as e:
+                    if attempt == MAX_RETRIES - 1:
+                        raise
+                    delay = 2 ** attempt + random.random()
+                    logger.warning(f"OpenAI request failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    
+    # Only accepted replies are kept, so a rejected one is asked for again on the next run
+    try:
+        result = accept(content) if accept else content
+    except Exception:
+        if cached:
+            cache_file.unlink(missing_ok=True)
+        raise
+        
+    if cache and not cached:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(content, encoding='utf-8')
+    return result
 
 class ModForgeAutoDeveloper:
     def __init__(self, task_type):
         self.task_type = task_type
-        self.error_log = []
+        self.build_errors = []
         self.changes_made = []
+        self.semaphore = None
+        self.state = self._load_state()
         
     def run(self):
         """Main execution method for the automated developer"""
@@ -59,16 +335,8 @@ class ModForgeAutoDeveloper:
         codebase_info = self.analyze_codebase()
         
         # Execute the chosen task
-        if self.task_type == 'fix-errors':
-            self.fix_errors(codebase_info)
-        elif self.task_type == 'improve-code':
-            self.improve_code(codebase_info)
-        elif self.task_type == 'generate-docs':
-            self.generate_documentation(codebase_info)
-        elif self.task_type == 'add-feature':
-            self.add_feature(codebase_info)
-        else:
-            logger.error(f"Unknown task type: {self.task_type}")
+        asyncio.run(self._run_task(codebase_info))
+        self._save_state()
             
         # Log summary of changes
         logger.info(f"Completed {self.task_type} task. {len(self.changes_made)} changes made.")
@@ -77,21 +345,78 @@ class ModForgeAutoDeveloper:
             
         return len(self.changes_made) > 0
         
+    def _load_state(self):
+        """Load the file hashes and scan results recorded by the previous run"""
+        state = {'files': {}, 'processed': {}}
+        if STATE_FILE.exists() and not args.full:
+            try:
+                with open(STATE_FILE, 'r') as f:
+                    state.update(json.load(f))
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable state file {STATE_FILE}: {e}")
+        return state
+        
+    def _save_state(self):
+        """Record file hashes and scan results for the next run"""
+        try:
+            with open(STATE_FILE, 'w') as f:
+                json.dump(self.state, f)
+        except Exception as e:
+            logger.error(f"Failed to save state file {STATE_FILE}: {e}")
+            
+    def _changed_files(self, file_paths, codebase_info):
+        """Return the files whose content changed since this task last processed them"""
+        processed = self.state['processed'].get(self.task_type, {})
+        file_hashes = codebase_info['file_hashes']
+        return [path for path in file_paths if processed.get(path) != file_hashes.get(path)]
+        
+    def _mark_processed(self, file_path, content):
+        """Record the content this task left a file with so unchanged files are skipped next run"""
+        self.state['processed'].setdefault(self.task_type, {})[file_path] = _hash_bytes(content.encode('utf-8'))
+        
+    async def _run_task(self, codebase_info):
+        """Dispatch the chosen task on the event loop"""
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        
+        try:
+            if self.task_type == 'fix-errors':
+                await self.fix_errors(codebase_info)
+            elif self.task_type == 'improve-code':
+                await self.improve_code(codebase_info)
+            elif self.task_type == 'generate-docs':
+                await self.generate_documentation(codebase_info)
+            elif self.task_type == 'add-feature':
+                await self.add_feature(codebase_info)
+            else:
+                logger.error(f"Unknown task type: {self.task_type}")
+        finally:
+            await _http.aclose()
+        
     def analyze_codebase(self):
         """Gather information about the codebase structure and state"""
         logger.info("Analyzing codebase structure...")
         
-        # Run gradle build for compilation errors
+        # Compile with gradle to check for errors; only javac diagnostics are needed, so skip tests and logging
         try:
-            logger.info("Running gradle build to check for errors...")
-            result = subprocess.run(['./gradlew', 'build', '--info'], 
-                                   cwd=ROOT_DIR,
-                                   capture_output=True, 
-                                   text=True)
+            logger.info("Running gradle compileJava to check for errors...")
+            process = subprocess.Popen(['./gradlew', '--daemon', '--configuration-cache', '--configuration-cache-problems=warn',
+                                        '--build-cache', '-q', 'compileJava'],
+                                       cwd=ROOT_DIR,
+                                       stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.PIPE)
             
-            if result.returncode != 0:
-                logger.warning("Build failed, capturing errors for analysis")
-                self.error_log.append(result.stderr)
+            # Match diagnostics line by line instead of buffering the whole log
+            errors = []
+            for line in process.stderr:
+                match = _ERR_RE.search(line)
+                if match:
+                    file_path, line_num, severity, message = (group.decode('utf-8', 'replace') for group in match.groups())
+                    errors.append((severity, message.rstrip(), file_path, int(line_num)))
+            process.wait()
+            
+            if process.returncode != 0:
+                logger.warning(f"Build failed, captured {len(errors)} errors for analysis")
+                self.build_errors.extend(errors)
             else:
                 logger.info("Build successful")
                 
@@ -99,39 +424,49 @@ class ModForgeAutoDeveloper:
             logger.error(f"Failed to run gradle build: {e}")
             
         # Collect Java source files
-        java_files = list(JAVA_SRC_DIR.glob('**/*.java'))
+        java_files = list(_iter_java(JAVA_SRC_DIR))
         logger.info(f"Found {len(java_files)} Java source files")
         
         # Extract class structure from Java files (simplified)
         classes = {}
         package_structure = {}
         
-        for java_file in java_files:
+        # Only rescan files modified since the previous run
+        known_files = self.state['files']
+        stale_files = []
+        for path in java_files:
+            known = known_files.get(path)
             try:
-                with open(java_file, 'r') as f:
-                    content = f.read()
+                if not known or known[0] != os.stat(path).st_mtime_ns:
+                    stale_files.append(path)
+            except OSError:
+                stale_files.append(path)
+        logger.info(f"Scanning {len(stale_files)} new or modified Java files")
+        
+        # Scan the files in parallel
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for scanned in executor.map(_scan_java, stale_files, chunksize=16):
+                if scanned:
+                    known_files[scanned[0]] = list(scanned[1:])
                     
-                # Extract package
-                package_match = re.search(r'package\s+([\w.]+);', content)
-                package = package_match.group(1) if package_match else "unknown"
+        # Merge the results in order, dropping files that no longer exist
+        self.state['files'] = {path: known_files[path] for path in java_files if path in known_files}
+        file_hashes = {}
+        for path, (mtime_ns, file_hash, package, class_name, class_type) in self.state['files'].items():
+            file_hashes[path] = file_hash
+            if not class_name:
+                continue
                 
-                # Extract class name
-                class_match = re.search(r'(public|private)\s+(final\s+)?(class|interface|enum)\s+(\w+)', content)
-                if class_match:
-                    class_name = class_match.group(4)
-                    if package not in package_structure:
-                        package_structure[package] = []
-                    package_structure[package].append(class_name)
-                    
-                    # Store class info
-                    classes[class_name] = {
-                        'path': str(java_file),
-                        'package': package,
-                        'type': class_match.group(3),  # class, interface, or enum
-                        'content': content
-                    }
-            except Exception as e:
-                logger.error(f"Error processing {java_file}: {e}")
+            if package not in package_structure:
+                package_structure[package] = []
+            package_structure[package].append(class_name)
+            
+            # Store class info
+            classes[class_name] = {
+                'path': path,
+                'package': package,
+                'type': class_type
+            }
                 
         # Collect information about the plugin.xml file
         plugin_xml_path = RESOURCES_DIR / 'META-INF' / 'plugin.xml'
@@ -146,175 +481,144 @@ class ModForgeAutoDeveloper:
         return {
             'classes': classes,
             'package_structure': package_structure,
-            'error_log': self.error_log,
+            'build_errors': self.build_errors,
             'plugin_xml': plugin_xml_content,
-            'java_files': [str(f) for f in java_files]
+            'java_files': java_files,
+            'file_hashes': file_hashes
         }
         
-    def fix_errors(self, codebase_info):
+    async def fix_errors(self, codebase_info):
         """Fix compilation errors in the codebase"""
-        if not self.error_log:
+        errors = self.build_errors
+        if not errors:
             logger.info("No compilation errors found")
             return
             
-        logger.info(f"Analyzing {len(self.error_log)} error logs")
+        logger.info(f"Analyzing {len(errors)} build errors")
         
-        for error_text in self.error_log:
-            # Extract individual errors
-            error_patterns = re.findall(r'(error|warning):\s+(.*?)\n\s+at\s+(.*?):(\d+)', error_text, re.DOTALL)
+        # Group errors by file so each file gets one request and one consolidated patch
+        errors_by_file = defaultdict(list)
+        for severity, message, file_path, line_num in errors:
+            errors_by_file[file_path].append((severity, message, line_num))
             
-            for severity, message, file_path, line_num in error_patterns:
-                try:
-                    self._fix_specific_error(severity, message, file_path, int(line_num), codebase_info)
-                except Exception as e:
-                    logger.error(f"Failed to fix error in {file_path}: {e}")
+        # Ask for all fixes concurrently
+        results = await asyncio.gather(
+            *(self._fix_file_errors(file_path, file_errors, codebase_info) for file_path, file_errors in errors_by_file.items()),
+            return_exceptions=True
+        )
+        for file_path, result in zip(errors_by_file, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to fix errors in {file_path}: {result}")
     
-    def _fix_specific_error(self, severity, message, file_path, line_num, codebase_info):
-        """Fix a specific error using AI assistance"""
-        # Read the file content
+    async def _fix_file_errors(self, file_path, file_errors, codebase_info):
+        """Fix all errors reported for one file with a single AI request"""
+        # Extract a numbered code snippet around each error (context) without reading the whole file
         try:
-            with open(file_path, 'r') as f:
-                content = f.read().split('\n')
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offsets = _line_offsets(file_path, mm)
+                error_sections = []
+                for index, (severity, message, line_num) in enumerate(file_errors, 1):
+                    first_line = max(0, line_num - 10)
+                    start, end = _line_range(offsets, len(mm), first_line, line_num + 10)
+                    snippet_lines = mm[start:end].decode('utf-8').removesuffix('\n').split('\n')
+                    code_context = '\n'.join(f"{number:>5}: {line}" for number, line in enumerate(snippet_lines, first_line + 1))
+                    error_sections.append(f"Error {index}: {severity} at line {line_num}: {message}\n```java\n{code_context}\n```")
         except Exception as e:
             logger.error(f"Could not read {file_path}: {e}")
             return
-            
-        # Extract a code snippet around the error (context)
-        start_line = max(0, line_num - 10)
-        end_line = min(len(content), line_num + 10)
-        code_context = '\n'.join(content[start_line:end_line])
         
-        # Generate fix using OpenAI
+        # Generate fixes using OpenAI
         try:
-            logger.info(f"Asking AI to fix {severity}: {message} in {file_path}:{line_num}")
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert Java developer specializing in IntelliJ plugin development. Your task is to fix compilation errors in the code."},
-                    {"role": "user", "content": f"Fix the following {severity} in a Java file:\n\nError message: {message}\nFile: {file_path}\nLine: {line_num}\n\nCode context:\n```java\n{code_context}\n```\n\nProvide only the corrected code snippet without explanations."}
-                ]
-            )
-            
-            fixed_code = response.choices[0].message['content'].strip()
-            
-            # Extract just the code (remove markdown formatting if present)
-            if fixed_code.startswith('```java'):
-                fixed_code = fixed_code.split('```java')[1]
-                if '```' in fixed_code:
-                    fixed_code = fixed_code.split('```')[0]
-            
-            # Apply the fix
-            new_content = content.copy()
-            # Replace the relevant lines with the fix (estimate range based on the AI response)
-            code_lines = fixed_code.strip().split('\n')
-            target_start = max(0, line_num - 3)
-            target_end = min(len(content), line_num + len(code_lines))
+            logger.info(f"Asking AI to fix {len(file_errors)} errors in {file_path}")
             
-            new_content[target_start:target_end] = code_lines
+            # The diff is applied as the reply is accepted, so a diff that doesn't match the file is not cached
+            hunks = await _ask([
+                {"role": "system", "content": "You are an expert Java developer specializing in IntelliJ plugin development. Your task is to fix compilation errors in the code."},
+                {"role": "user", "content": f"Fix the following errors in the Java file {file_path}. Each code context is prefixed with its line numbers.\n\n" + "\n\n".join(error_sections) + f"\n\nRespond only with a unified diff against {file_path}, using ---/+++/@@ headers with the real line numbers shown above and without the line number prefixes in the diff lines."}
+            ], self.semaphore, until_fence=True, accept=lambda text: _apply_unified_diff(file_path, _strip_fence(text, keep_newline=True)))
             
-            # Write the fixed content back to the file
-            with open(file_path, 'w') as f:
-                f.write('\n'.join(new_content))
+            if not hunks:
+                logger.info(f"No fixes suggested for {file_path}")
+                return
                 
-            self.changes_made.append(f"Fixed {severity} in {file_path}:{line_num}: {message[:50]}...")
-            logger.info(f"Fixed {severity} in {file_path}:{line_num}")
+            for severity, message, line_num in file_errors:
+                self.changes_made.append(f"Fixed {severity} in {file_path}:{line_num}: {message[:50]}...")
+            logger.info(f"Fixed {len(file_errors)} errors in {file_path}")
             
         except Exception as e:
-            logger.error(f"Failed to fix error with AI: {e}")
+            logger.error(f"Failed to fix errors with AI: {e}")
             
-    def improve_code(self, codebase_info):
+    async def improve_code(self, codebase_info):
         """Improve code quality without changing functionality"""
-        # Select files to improve (we'll limit to 3 per run to avoid too many changes)
-        java_files = codebase_info['java_files'][:3]
+        # Select changed files to improve (limited per run to avoid too many changes)
+        java_files = self._changed_files(codebase_info['java_files'], codebase_info)[:args.max_files]
         
-        for file_path in java_files:
-            try:
-                with open(file_path, 'r') as f:
-                    content = f.read()
-                    
-                # Ask AI to improve the code
-                logger.info(f"Improving code quality in {file_path}")
-                
-                response = openai.ChatCompletion.create(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": "You are an expert Java developer specializing in IntelliJ plugin development. Your task is to improve code quality without changing functionality."},
-                        {"role": "user", "content": f"Improve the code quality of this Java file without changing its functionality. Focus on readability, maintainability, and performance:\n\n```java\n{content}\n```\n\nProvide only the improved code without explanations."}
-                    ]
-                )
-                
-                improved_code = response.choices[0].message['content'].strip()
-                
-                # Extract just the code (remove markdown formatting if present)
-                if improved_code.startswith('```java'):
-                    improved_code = improved_code.split('```java')[1]
-                    if '```' in improved_code:
-                        improved_code = improved_code.split('```')[0]
-                elif improved_code.startswith('```'):
-                    improved_code = improved_code.split('```')[1]
-                    if '```' in improved_code:
-                        improved_code = improved_code.split('```')[0]
-                
-                # Write the improved code back to the file
-                with open(file_path, 'w') as f:
-                    f.write(improved_code)
-                    
-                self.changes_made.append(f"Improved code quality in {file_path}")
-                logger.info(f"Improved code quality in {file_path}")
+        # All files are requested concurrently, so wall time follows the slowest file rather than the sum
+        await asyncio.gather(*(self._improve_file(file_path) for file_path in java_files))
+        
+    async def _improve_file(self, file_path):
+        """Improve the code quality of a single file"""
+        try:
+            # File I/O runs in worker threads so it doesn't stall the other requests
+            content = await asyncio.to_thread(Path(file_path).read_text, encoding='utf-8')
                 
-            except Exception as e:
-                logger.error(f"Failed to improve code in {file_path}: {e}")
+            # Ask AI to improve the code
+            logger.info(f"Improving code quality in {file_path}")
+            
+            improved_code = await _ask([
+                {"role": "system", "content": "You are an expert Java developer specializing in IntelliJ plugin development. Your task is to improve code quality without changing functionality."},
+                {"role": "user", "content": f"Improve the code quality of this Java file without changing its functionality. Focus on readability, maintainability, and performance:\n\n```java\n{content}\n```\n\nProvide only the improved code without explanations."}
+            ], self.semaphore, until_fence=True, accept=_fenced_code)
+            
+            # Write the improved code back to the file
+            await asyncio.to_thread(Path(file_path).write_text, improved_code, encoding='utf-8')
+            self._mark_processed(file_path, improved_code)
                 
-    def generate_documentation(self, codebase_info):
+            self.changes_made.append(f"Improved code quality in {file_path}")
+            logger.info(f"Improved code quality in {file_path}")
+            
+        except Exception as e:
+            logger.error(f"Failed to improve code in {file_path}: {e}")
+            
+    async def generate_documentation(self, codebase_info):
         """Generate or improve documentation for classes"""
-        # Select classes that might need better documentation
-        classes = list(codebase_info['classes'].items())[:3]  # Limit to 3 per run
+        # Select changed classes that might need better documentation
+        changed_files = set(self._changed_files([info['path'] for info in codebase_info['classes'].values()], codebase_info))
+        classes = [(name, info) for name, info in codebase_info['classes'].items() if info['path'] in changed_files][:args.max_files]
         
-        for class_name, class_info in classes:
-            try:
-                file_path = class_info['path']
-                content = class_info['content']
-                
-                # Check if class already has detailed JavaDoc
-                if '/**' in content and '@author' in content and '@since' in content:
-                    logger.info(f"Class {class_name} already has good documentation")
-                    continue
-                
-                # Ask AI to generate documentation
-                logger.info(f"Generating documentation for {class_name}")
-                
-                response = openai.ChatCompletion.create(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": "You are an expert Java developer specializing in IntelliJ plugin development. Your task is to generate comprehensive JavaDoc documentation."},
-                        {"role": "user", "content": f"Generate comprehensive JavaDoc documentation for this Java class, including class-level docs, method docs, and parameter descriptions:\n\n```java\n{content}\n```\n\nProvide only the fully documented code without explanations."}
-                    ]
-                )
-                
-                documented_code = response.choices[0].message['content'].strip()
-                
-                # Extract just the code (remove markdown formatting if present)
-                if documented_code.startswith('```java'):
-                    documented_code = documented_code.split('```java')[1]
-                    if '```' in documented_code:
-                        documented_code = documented_code.split('```')[0]
-                elif documented_code.startswith('```'):
-                    documented_code = documented_code.split('```')[1]
-                    if '```' in documented_code:
-                        documented_code = documented_code.split('```')[0]
-                
-                # Write the documented code back to the file
-                with open(file_path, 'w') as f:
-                    f.write(documented_code)
-                    
-                self.changes_made.append(f"Added documentation to {class_name}")
-                logger.info(f"Added documentation to {class_name}")
-                
-            except Exception as e:
-                logger.error(f"Failed to generate documentation for {class_name}: {e}")
+        await asyncio.gather(*(self._document_class(class_name, class_info) for class_name, class_info in classes))
+        
+    async def _document_class(self, class_name, class_info):
+        """Generate documentation for a single class"""
+        try:
+            file_path = class_info['path']
+            content = await asyncio.to_thread(Path(file_path).read_text, encoding='utf-8')
+            
+            # Check if class already has detailed JavaDoc
+            if '/**' in content and '@author' in content and '@since' in content:
+                logger.info(f"Class {class_name} already has good documentation")
+                self._mark_processed(file_path, content)
+                return
+            
+            # Ask AI to generate documentation
+            logger.info(f"Generating documentation for {class_name}")
+            
+            documented_code = await _ask([
+                {"role": "system", "content": "You are an expert Java developer specializing in IntelliJ plugin development. Your task is to generate comprehensive JavaDoc documentation."},
+                {"role": "user", "content": f"Generate comprehensive JavaDoc documentation for this Java class, including class-level docs, method docs, and parameter descriptions:\n\n```java\n{content}\n```\n\nProvide only the fully documented code without explanations."}
+            ], self.semaphore, until_fence=True, accept=_fenced_code)
+            
+            # Write the documented code back to the file
+            await asyncio.to_thread(Path(file_path).write_text, documented_code, encoding='utf-8')
+            self._mark_processed(file_path, documented_code)
                 
-    def add_feature(self, codebase_info):
+            self.changes_made.append(f"Added documentation to {class_name}")
+            logger.info(f"Added documentation to {class_name}")
+            
+        except Exception as e:
+            logger.error(f"Failed to generate documentation for {class_name}: {e}")
+            
+    async def add_feature(self, codebase_info):
         """Add a new feature to the codebase"""
         # For "add feature", we'll need to be more creative
         # We'll generate a random improvement idea based on the codebase analysis
@@ -325,22 +629,22 @@ class ModForgeAutoDeveloper:
             packages = list(codebase_info['package_structure'].keys())
             package_summary = '\n'.join([f"- {pkg}: {', '.join(classes[:5])}" for pkg, classes in codebase_info['package_structure'].items()])
             
-            # Ask AI for feature suggestions
+            # Ask AI for feature suggestions, on a model that supports JSON mode (base gpt-4 rejects it)
+            # Not cached, the same package layout would otherwise suggest the same feature every run
             logger.info("Generating feature idea based on codebase analysis")
             
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert Java developer specializing in IntelliJ plugin development. Your task is to suggest a valuable, self-contained feature to add to the ModForge IntelliJ plugin."},
-                    {"role": "user", "content": f"Based on the following package structure of a ModForge IntelliJ Plugin that helps with Minecraft mod development, suggest ONE specific, well-defined feature to implement that would add value to the plugin. The feature should be small enough to implement in one pass.\n\nPackage structure:\n{package_summary}\n\nRespond with a JSON object with these fields: 'feature_name', 'description', 'implementation_plan' (with specific files to modify), and 'priority' (1-5, with 5 being highest)."}
-                ]
-            )
-            
-            feature_suggestion = response.choices[0].message['content'].strip()
+            feature_suggestion = await _ask([
+                {"role": "system", "content": "You are an expert Java developer specializing in IntelliJ plugin development. Your task is to suggest a valuable, self-contained feature to add to the ModForge IntelliJ plugin."},
+                {"role": "user", "content": f"Based on the following package structure of a ModForge IntelliJ Plugin that helps with Minecraft mod development, suggest ONE specific, well-defined feature to implement that would add value to the plugin. The feature should be small enough to implement in one pass.\n\nPackage structure:\n{package_summary}\n\nRespond with a JSON object with these fields: 'feature_name', 'description', 'implementation_plan' (an object with 'files_to_modify', an array of file paths, and 'update_plugin_xml', a boolean), and 'priority' (1-5, with 5 being highest)."}
+            ], self.semaphore, model="gpt-4o", cache=False, response_format={"type": "json_object"})
             
             # Parse the JSON response
             try:
-                feature_json = json.loads(feature_suggestion.strip('```json').strip('```').strip())
+                feature_json = json.loads(_strip_fence(feature_suggestion))
+                for field, field_type in FEATURE_FIELDS.items():
+                    if not isinstance(feature_json.get(field), field_type):
+                        raise ValueError(f"Feature suggestion field '{field}' is missing or not a {field_type.__name__}")
+                        
                 feature_name = feature_json['feature_name']
                 description = feature_json['description']
                 implementation_plan = feature_json['implementation_plan']
@@ -350,139 +654,103 @@ class ModForgeAutoDeveloper:
                 logger.info(f"Description: {description}")
                 
                 # Now let's implement the feature
-                self._implement_feature(feature_json, codebase_info)
+                await self._implement_feature(feature_json, codebase_info)
                 
-            except json.JSONDecodeError:
-                logger.error("Could not parse feature suggestion as JSON")
+            except (json.JSONDecodeError, ValueError) as e:
+                logger.error(f"Could not parse feature suggestion: {e}")
                 logger.info(f"Raw suggestion: {feature_suggestion}")
                 
         except Exception as e:
             logger.error(f"Failed to generate feature idea: {e}")
             
-    def _implement_feature(self, feature, codebase_info):
+    async def _implement_feature(self, feature, codebase_info):
         """Implement a specific feature based on the AI suggestion"""
         # This is a simplified implementation - in a real system, this would be more sophisticated
+        tasks = [self._implement_feature_file(file_path, feature)
+                 for file_path in feature.get('implementation_plan', {}).get('files_to_modify', [])]
+                 
+        # Update plugin.xml if needed
+        if feature.get('implementation_plan', {}).get('update_plugin_xml', False):
+            tasks.append(self._update_plugin_xml(feature))
+            
+        await asyncio.gather(*tasks)
         
-        for file_path in feature.get('implementation_plan', {}).get('files_to_modify', []):
-            if not os.path.exists(file_path):
-                # Check if it's a new file to create
-                if file_path.endswith('.java'):
-                    # Generate the new file content
-                    class_name = os.path.basename(file_path).replace('.java', '')
-                    package_path = os.path.dirname(file_path).replace('/', '.').replace('src.main.java.', '')
-                    
-                    logger.info(f"Creating new class {class_name} in package {package_path}")
-                    
-                    try:
-                        response = openai.ChatCompletion.create(
-                            model="gpt-4",
-                            messages=[
-                                {"role": "system", "content": "You are an expert Java developer specializing in IntelliJ plugin development. Your task is to create a new Java class."},
-                                {"role": "user", "content": f"Create a new Java class for the ModForge IntelliJ plugin:\n\nClass name: {class_name}\nPackage: {package_path}\nFeature to implement: {feature['description']}\n\nProvide only the complete Java code with proper package declaration, imports, and comprehensive JavaDoc."}
-                            ]
-                        )
-                        
-                        new_class_code = response.choices[0].message['content'].strip()
-                        
-                        # Extract just the code (remove markdown formatting if present)
-                        if new_class_code.startswith('```java'):
-                            new_class_code = new_class_code.split('```java')[1]
-                            if '```' in new_class_code:
-                                new_class_code = new_class_code.split('```')[0]
-                        elif new_class_code.startswith('```'):
-                            new_class_code = new_class_code.split('```')[1]
-                            if '```' in new_class_code:
-                                new_class_code = new_class_code.split('```')[0]
-                        
-                        # Create directory if needed
-                        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                        
-                        # Write the new class to file
-                        with open(file_path, 'w') as f:
-                            f.write(new_class_code)
-                            
-                        self.changes_made.append(f"Created new class {class_name} for feature: {feature['feature_name']}")
-                        logger.info(f"Created new class {class_name}")
-                        
-                    except Exception as e:
-                        logger.error(f"Failed to create new class {class_name}: {e}")
-            else:
-                # Modify existing file
+    async def _implement_feature_file(self, file_path, feature):
+        """Create or modify a single file for the feature"""
+        if not os.path.exists(file_path):
+            # Check if it's a new file to create
+            if file_path.endswith('.java'):
+                # Generate the new file content
+                class_name = os.path.basename(file_path).replace('.java', '')
+                package_path = os.path.dirname(file_path).replace('/', '.').replace('src.main.java.', '')
+                
+                logger.info(f"Creating new class {class_name} in package {package_path}")
+                
                 try:
-                    with open(file_path, 'r') as f:
-                        content = f.read()
-                        
-                    logger.info(f"Modifying existing file {file_path}")
-                    
-                    response = openai.ChatCompletion.create(
-                        model="gpt-4",
-                        messages=[
-                            {"role": "system", "content": "You are an expert Java developer specializing in IntelliJ plugin development. Your task is to modify a Java file to implement a new feature."},
-                            {"role": "user", "content": f"Modify this Java file to implement the following feature:\n\nFeature: {feature['description']}\n\nCurrent code:\n```java\n{content}\n```\n\nProvide only the complete modified code without explanations."}
-                        ]
-                    )
+                    new_class_code = await _ask([
+                        {"role": "system", "content": "You are an expert Java developer specializing in IntelliJ plugin development. Your task is to create a new Java class."},
+                        {"role": "user", "content": f"Create a new Java class for the ModForge IntelliJ plugin:\n\nClass name: {class_name}\nPackage: {package_path}\nFeature to implement: {feature['description']}\n\nProvide only the complete Java code with proper package declaration, imports, and comprehensive JavaDoc."}
+                    ], self.semaphore, until_fence=True, accept=_fenced_code)
                     
-                    modified_code = response.choices[0].message['content'].strip()
+                    # Create directory if needed
+                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
                     
-                    # Extract just the code (remove markdown formatting if present)
-                    if modified_code.startswith('```java'):
-                        modified_code = modified_code.split('```java')[1]
-                        if '```' in modified_code:
-                            modified_code = modified_code.split('```')[0]
-                    elif modified_code.startswith('```'):
-                        modified_code = modified_code.split('```')[1]
-                        if '```' in modified_code:
-                            modified_code = modified_code.split('```')[0]
-                    
-                    # Write the modified code back to the file
+                    # Write the new class to file
                     with open(file_path, 'w') as f:
-                        f.write(modified_code)
+                        f.write(new_class_code)
                         
-                    self.changes_made.append(f"Modified {file_path} for feature: {feature['feature_name']}")
-                    logger.info(f"Modified {file_path}")
+                    self.changes_made.append(f"Created new class {class_name} for feature: {feature['feature_name']}")
+                    logger.info(f"Created new class {class_name}")
                     
                 except Exception as e:
-                    logger.error(f"Failed to modify {file_path}: {e}")
-                    
-        # Update plugin.xml if needed
-        if feature.get('implementation_plan', {}).get('update_plugin_xml', False):
-            plugin_xml_path = RESOURCES_DIR / 'META-INF' / 'plugin.xml'
-            if plugin_xml_path.exists():
-                try:
-                    with open(plugin_xml_path, 'r') as f:
-                        plugin_xml = f.read()
-                        
-                    logger.info("Updating plugin.xml for the new feature")
-                    
-                    response = openai.ChatCompletion.create(
-                        model="gpt-4",
-                        messages=[
-                            {"role": "system", "content": "You are an expert Java developer specializing in IntelliJ plugin development. Your task is to update the plugin.xml file to register a new feature."},
-                            {"role": "user", "content": f"Update this plugin.xml file to include the new feature:\n\nFeature: {feature['description']}\nFeature name: {feature['feature_name']}\n\nCurrent plugin.xml:\n```xml\n{plugin_xml}\n```\n\nProvide only the complete modified XML without explanations."}
-                        ]
-                    )
+                    logger.error(f"Failed to create new class {class_name}: {e}")
+        else:
+            # Modify existing file
+            try:
+                with open(file_path, 'r') as f:
+                    content = f.read()
                     
-                    modified_xml = response.choices[0].message['content'].strip()
+                logger.info(f"Modifying existing file {file_path}")
+                
+                modified_code = await _ask([
+                    {"role": "system", "content": "You are an expert Java developer specializing in IntelliJ plugin development. Your task is to modify a Java file to implement a new feature."},
+                    {"role": "user", "content": f"Modify this Java file to implement the following feature:\n\nFeature: {feature['description']}\n\nCurrent code:\n```java\n{content}\n```\n\nProvide only the complete modified code without explanations."}
+                ], self.semaphore, until_fence=True, accept=_fenced_code)
+                
+                # Write the modified code back to the file
+                with open(file_path, 'w') as f:
+                    f.write(modified_code)
                     
-                    # Extract just the XML (remove markdown formatting if present)
-                    if modified_xml.startswith('```xml'):
-                        modified_xml = modified_xml.split('```xml')[1]
-                        if '```' in modified_xml:
-                            modified_xml = modified_xml.split('```')[0]
-                    elif modified_xml.startswith('```'):
-                        modified_xml = modified_xml.split('```')[1]
-                        if '```' in modified_xml:
-                            modified_xml = modified_xml.split('```')[0]
+                self.changes_made.append(f"Modified {file_path} for feature: {feature['feature_name']}")
+                logger.info(f"Modified {file_path}")
+                
+            except Exception as e:
+                logger.error(f"Failed to modify {file_path}: {e}")
+                
+    async def _update_plugin_xml(self, feature):
+        """Register the feature in plugin.xml"""
+        plugin_xml_path = RESOURCES_DIR / 'META-INF' / 'plugin.xml'
+        if plugin_xml_path.exists():
+            try:
+                with open(plugin_xml_path, 'r') as f:
+                    plugin_xml = f.read()
                     
-                    # Write the modified XML back to the file
-                    with open(plugin_xml_path, 'w') as f:
-                        f.write(modified_xml)
-                        
-                    self.changes_made.append(f"Updated plugin.xml for feature: {feature['feature_name']}")
-                    logger.info("Updated plugin.xml")
+                logger.info("Updating plugin.xml for the new feature")
+                
+                modified_xml = await _ask([
+                    {"role": "system", "content": "You are an expert Java developer specializing in IntelliJ plugin development. Your task is to update the plugin.xml file to register a new feature."},
+                    {"role": "user", "content": f"Update this plugin.xml file to include the new feature:\n\nFeature: {feature['description']}\nFeature name: {feature['feature_name']}\n\nCurrent plugin.xml:\n```xml\n{plugin_xml}\n```\n\nProvide only the complete modified XML without explanations."}
+                ], self.semaphore, until_fence=True, accept=_fenced_code)
+                
+                # Write the modified XML back to the file
+                with open(plugin_xml_path, 'w') as f:
+                    f.write(modified_xml)
                     
-                except Exception as e:
-                    logger.error(f"Failed to update plugin.xml: {e}")
+                self.changes_made.append(f"Updated plugin.xml for feature: {feature['feature_name']}")
+                logger.info("Updated plugin.xml")
+                
+            except Exception as e:
+                logger.error(f"Failed to update plugin.xml: {e}")
 
 # Run the automated development process
 if __name__ == "__main__":